@@ -31,7 +31,9 @@ from app.models import (
 )
 
 # ThreadPoolExecutor global para execução do Playwright
-_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="playwright")
+# Um único worker: todas as operações usam o mesmo perfil persistente,
+# que o Chromium não permite abrir em dois processos ao mesmo tempo.
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="playwright")
 
 
 class DJIAgPlaywrightService:
@@ -82,7 +84,7 @@ class DJIAgPlaywrightService:
         print(f"🔐 Iniciando autenticação DJI AG para: {username}")
         
         # Executa Playwright em thread separada
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         result = await loop.run_in_executor(
             _executor,
             self._login_sync,
@@ -377,7 +379,7 @@ class DJIAgPlaywrightService:
                 records=[],
             )
         
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         result = await loop.run_in_executor(
             _executor,
             self._get_records_sync,
@@ -531,7 +533,7 @@ class DJIAgPlaywrightService:
                 message="Não autenticado. Faça login primeiro.",
             )
         
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         result = await loop.run_in_executor(
             _executor,
             self._download_record_sync,
@@ -613,7 +615,7 @@ class DJIAgPlaywrightService:
                 message="Não autenticado. Faça login primeiro.",
             )
         
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         result = await loop.run_in_executor(
             _executor,
             self._download_all_sync,
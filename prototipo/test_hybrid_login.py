@@ -8,28 +8,376 @@ Teste de login DJI AG seguindo o fluxo correto:
 5. Download via API usando cookies da sessão
 """
 
+import asyncio
+import gzip
+import inspect
 import os
+import re
 import sys
-import time
-import json
+import types
 from datetime import datetime
+from pathlib import Path
+
+import httpx
+import orjson
+from dotenv import load_dotenv
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, async_playwright
+
+# Caminhos do prototipo, resolvidos uma vez só
+BASE_DIR = Path(__file__).parent
+DOWNLOAD_DIR = BASE_DIR / "downloads"
+RECORDS_DIR = DOWNLOAD_DIR / "records"
+DEBUG_SCREENSHOT_PATH = BASE_DIR / "debug_screenshot.png"
 
 # Força output imediato
 sys.stdout.reconfigure(line_buffering=True)
 
-# Carregar .env manualmente
-env_path = os.path.join(os.path.dirname(__file__), ".env")
-if os.path.exists(env_path):
-    with open(env_path) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith("#") and "=" in line:
-                key, value = line.split("=", 1)
-                os.environ[key.strip()] = value.strip()
+# Carregar .env (python-dotenv já é dependência do projeto; não sobrescreve o ambiente)
+load_dotenv(BASE_DIR / ".env")
 
 USERNAME = os.environ.get("DJI_USERNAME", "")
 PASSWORD = os.environ.get("DJI_PASSWORD", "")
 
+# Records abertos via Playback na ETAPA 6 e quantas abas podem rodar em paralelo
+PLAYBACK_RECORDS = int(os.environ.get("PLAYBACK_RECORDS", "1"))
+PLAYBACK_CONCURRENCY = int(os.environ.get("PLAYBACK_CONCURRENCY", "4"))
+
+# Dumps de depuração (screenshot/HTML) fora do caminho crítico: só com DEBUG_DUMP=1
+DEBUG_DUMP = os.environ.get("DEBUG_DUMP", "") not in ("", "0")
+# Pausa de 5s antes de fechar o browser (para inspecionar a tela): só com DEBUG_KEEP_BROWSER=1
+DEBUG_KEEP_BROWSER = os.environ.get("DEBUG_KEEP_BROWSER", "") not in ("", "0")
+
+# Domínios cujos cookies formam a sessão (usados para replay via API)
+SESSION_COOKIE_URLS = ["https://www.djiag.com", "https://account.dji.com"]
+
+# Artefatos lidos por máquina saem compactos; indentados só para depuração
+JSON_OPTIONS = orjson.OPT_INDENT_2 if DEBUG_DUMP else 0
+
+
+def write_json(path, data, option=JSON_OPTIONS):
+    """Grava data como JSON UTF-8 via orjson (bem mais rápido que json.dump com indent)"""
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data, option=option))
+
+
+# Endpoint autenticado usado para confirmar a sessão salva sem passar pelo login:
+# a listagem de records da API web (mesma base do app/services/djiag_service.py)
+AUTH_PROBE_URL = os.environ.get(
+    "DJI_AUTH_PROBE_URL",
+    "https://kr-ag2-api.dji.com/api/web/v1/flight_records?page_size=1&page=1",
+)
+
+# Recursos que a automação nunca lê (stylesheets ficam: a aba List depende do CSS)
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+BLOCKED_HOSTS = ("google-analytics", "googletagmanager", "hotjar", "sentry")
+BLOCKED_HOSTS_RE = re.compile("|".join(map(re.escape, BLOCKED_HOSTS)))
+
+
+async def probe_session(request_context):
+    """
+    Confirma a sessão salva pelo AUTH_PROBE_URL. Só conta como válida uma
+    resposta JSON de sucesso ("success" ou "code" == 0): HTML do SPA (que
+    responde 200 a qualquer caminho), 401 ou erro são inconclusivos, e o
+    chamador segue para a verificação pela página.
+    """
+    try:
+        resp = await request_context.get(AUTH_PROBE_URL, timeout=5000)
+    except Exception:
+        return False
+    try:
+        if not resp.ok or "json" not in resp.headers.get("content-type", ""):
+            return False
+        data = orjson.loads(await resp.body())
+    except Exception:
+        return False
+    finally:
+        await resp.dispose()
+    return isinstance(data, dict) and (data.get("success") is True or data.get("code") == 0)
+
+
+async def block_assets(route):
+    """Aborta analytics e imagens/fontes/mídia do djiag (o CAPTCHA do account.dji.com precisa das imagens)"""
+    request = route.request
+    url = request.url
+    if BLOCKED_HOSTS_RE.search(url) or (
+        "djiag.com" in url and request.resource_type in BLOCKED_RESOURCE_TYPES
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+# URLs de vídeo, rota (airline) e dados de voo na aba de Playback. Só extensões e
+# caminhos conhecidos ('video'/'media' soltos na URL pegavam analytics), incluindo
+# os payloads binários que o repositório captura (flight_datas, objects/airline)
+MEDIA_RE = re.compile(
+    r"\.(?:mp4|webm|m3u8|ts|flv)(?:\?|$)|/(?:flight_records|airlines?)/|flight_datas|objects/airline",
+    re.IGNORECASE,
+)
+# Content-types de mídia/dados binários (detectados na resposta, não na URL)
+CONTENT_TYPE_RE = re.compile(r"video|octet-stream", re.IGNORECASE)
+
+# Elementos que indicam que a aba de Playback renderizou o player
+PLAYER_SELECTOR = 'canvas, video, [class*="player"]'
+
+# Tamanho do chunk ao gravar downloads de mídia em streaming
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def is_media_response(url, content_type):
+    """Resposta de mídia/dados de voo que vale baixar"""
+    return MEDIA_RE.search(url) is not None or CONTENT_TYPE_RE.search(content_type) is not None
+
+
+# Nome do arquivo por tipo de URL de mídia, em ordem de prioridade (primeiro que casar)
+MEDIA_CLASSIFIERS = (
+    (re.compile(r"airline"), "route"),  # dados de rota
+    (re.compile(r"flight_records"), "flight_data"),  # dados de voo
+)
+
+
+def media_filename(url, index, idx):
+    """Nome do arquivo de mídia baixado do record index"""
+    kind = next((kind for regex, kind in MEDIA_CLASSIFIERS if regex.search(url)), "media")
+    return f"record_{index}_{kind}_{idx}.bin"
+
+
+# Elementos que indicam que /records terminou de carregar (logado ou no login)
+RECORDS_TAB_SELECTOR = "div[role='tab']:has-text('List')"
+RECORDS_OR_LOGIN_SELECTOR = f"{RECORDS_TAB_SELECTOR}, input[type='checkbox']"
+
+# Seletores já mapeados na página de records (a exploração só roda com DEBUG_DISCOVER=1)
+LIST_ROW_SEL = ".ant-table-row"
+PLAYBACK_ICON_SEL = "td:last-child span.smart-ui-icon"
+BUTTON_CANDIDATES_SEL = 'button, a[role="button"], [class*="btn"], [class*="button"]'
+DOWNLOAD_ALL_RE = re.compile(r"download\s*all", re.IGNORECASE)
+DEBUG_DISCOVER = os.environ.get("DEBUG_DISCOVER", "") not in ("", "0")
+
+# data-row-key de todas as linhas da lista, numa única ida e volta ao browser
+ROW_KEYS_JS = f"() => Array.from(document.querySelectorAll('{LIST_ROW_SEL}'), (row) => row.getAttribute('data-row-key'))"
+
+# Introspecção da página de records em um único page.evaluate: uma ida e volta
+# ao browser, e cada querySelectorAll roda uma vez só (resultado memoizado)
+PAGE_INTROSPECT_JS = """
+() => {
+    const cache = new Map();
+    const q = (selector) => {
+        if (!cache.has(selector)) cache.set(selector, document.querySelectorAll(selector));
+        return cache.get(selector);
+    };
+    const className = (el) => typeof el.className === 'string' ? el.className : '';
+    
+    const buttons = [];
+    q('button, a[role="button"], [class*="btn"], [class*="button"]').forEach((btn, i) => {
+        if (i < 30) {
+            buttons.push({
+                index: i,
+                text: btn.textContent.trim().substring(0, 50),
+                classes: className(btn).substring(0, 80),
+                tag: btn.tagName,
+                hasIcon: btn.querySelector('svg') !== null,
+            });
+        }
+    });
+    
+    // Itens da lista: primeiro seletor que encontrar linhas
+    const listItems = [];
+    for (const selector of ['table tbody tr', '.ant-table-row', '[class*="list-item"]', '[class*="record-item"]', '[class*="task-item"]']) {
+        const rows = q(selector);
+        if (rows.length > 0) {
+            rows.forEach((row, i) => {
+                listItems.push({
+                    index: i,
+                    selector: selector,
+                    text: row.textContent.trim().substring(0, 100),
+                    hasViewButton: row.querySelector('button, a, [class*="view"], [class*="detail"], svg') !== null,
+                });
+            });
+            break;
+        }
+    }
+    
+    // Estrutura: contagem por seletor e primeiras 5 linhas de cada
+    const structure = {rows: [], selectors_found: []};
+    for (const selector of ['.ant-table-row', 'table tbody tr', '[class*="list"] [class*="item"]', '[class*="record"]', '[class*="task-row"]']) {
+        const elements = q(selector);
+        if (elements.length === 0) continue;
+        structure.selectors_found.push({selector, count: elements.length});
+        for (let i = 0; i < Math.min(elements.length, 5); i++) {
+            const el = elements[i];
+            structure.rows.push({
+                index: i,
+                selector: selector,
+                tagName: el.tagName,
+                classes: className(el).substring(0, 80),
+                text: (el.textContent || '').trim().substring(0, 80),
+                isClickable: el.onclick !== null || el.tagName === 'A' || el.style.cursor === 'pointer',
+                childButtons: el.querySelectorAll('button, a, [role="button"]').length,
+            });
+        }
+    }
+    
+    // Coluna Operation (última célula) das 3 primeiras .ant-table-row
+    const tableRows = q('.ant-table-row');
+    const rows = [];
+    for (let i = 0; i < Math.min(tableRows.length, 3); i++) {
+        const row = tableRows[i];
+        const cells = row.querySelectorAll('td');
+        const lastCell = cells[cells.length - 1];
+        const clickables = lastCell ? lastCell.querySelectorAll('span, button, a, svg, [role="button"]') : [];
+        rows.push({
+            rowIndex: i,
+            totalCells: cells.length,
+            lastCellClickables: Array.from(clickables, (el, j) => ({
+                index: j,
+                tag: el.tagName,
+                classes: className(el).substring(0, 60),
+                title: el.getAttribute('title') || '',
+                ariaLabel: el.getAttribute('aria-label') || '',
+            })),
+            dataRowKey: row.getAttribute('data-row-key'),
+        });
+    }
+    
+    return {buttons, listItems, structure, rows};
+}
+"""
+
+# Análise da página de playback de um record em uma única passada pelo DOM.
+# Instalada uma vez no contexto (add_init_script) como window.__analyze: cada aba
+# só chama a função, sem reenviar e reparsear o script a cada record
+RECORD_ANALYSIS_JS = """
+window.__analyze = () => {
+    const result = {
+        videos: [],
+        iframes: [],
+        canvas: [],
+        links: [],
+        buttons: [],
+        images: [],
+        audios: [],
+        sources: [],
+        divs_with_video_class: [],
+        all_media: [],
+    };
+    const className = (el) => typeof el.className === 'string' ? el.className : '';
+    const mediaClass = /video|player|playback|media/;
+    // Índices por categoria, como nos querySelectorAll separados
+    let linkIndex = 0, buttonIndex = 0, mediaIndex = 0, imageIndex = 0;
+
+    // Uma única passada pelo DOM, classificando cada elemento
+    const all = document.getElementsByTagName('*');
+    for (let n = 0; n < all.length; n++) {
+        const el = all[n];
+        const tag = el.tagName;
+
+        switch (tag) {
+            case 'VIDEO': {
+                // <source> válidos são filhos diretos do <video>: sem nova busca na subárvore
+                const sources = [];
+                for (const child of el.children) {
+                    if (child.tagName === 'SOURCE') sources.push(child.src);
+                }
+                result.videos.push({
+                    index: result.videos.length,
+                    src: el.src || el.currentSrc || '',
+                    poster: el.poster || '',
+                    sources,
+                });
+                break;
+            }
+            case 'IFRAME':
+                result.iframes.push({index: result.iframes.length, src: el.src || ''});
+                break;
+            // Canvas (pode ser onde renderiza o playback)
+            case 'CANVAS':
+                result.canvas.push({
+                    index: result.canvas.length,
+                    width: el.width,
+                    height: el.height,
+                    id: el.id || '',
+                    classes: className(el),
+                });
+                break;
+            // Links com download ou arquivos
+            case 'A': {
+                const i = linkIndex++;
+                const href = el.href || '';
+                if (href && (href.includes('download') || href.includes('.mp4') ||
+                    href.includes('.zip') || href.includes('.pdf') ||
+                    href.includes('blob:') || el.hasAttribute('download'))) {
+                    result.links.push({
+                        index: i,
+                        href: href.substring(0, 100),
+                        text: (el.textContent || '').trim().substring(0, 30),
+                        hasDownload: el.hasAttribute('download'),
+                    });
+                }
+                break;
+            }
+            // Sources de áudio/vídeo
+            case 'SOURCE':
+                result.sources.push({index: result.sources.length, src: el.src || '', type: el.type || ''});
+                break;
+            // Imagens grandes (podem ser frames/thumbnails)
+            case 'IMG': {
+                const i = imageIndex++;
+                if (el.naturalWidth > 200 || el.width > 200) {
+                    result.images.push({
+                        index: i,
+                        src: (el.src || '').substring(0, 100),
+                        width: el.width || el.naturalWidth,
+                        height: el.height || el.naturalHeight,
+                    });
+                }
+                break;
+            }
+        }
+
+        // Todos os botões
+        if (tag === 'BUTTON' || el.getAttribute('role') === 'button') {
+            const i = buttonIndex++;
+            const text = (el.textContent || '').trim();
+            const classes = className(el);
+            if (text || classes.includes('download') || classes.includes('export') || classes.includes('save')) {
+                result.buttons.push({
+                    index: i,
+                    text: text.substring(0, 40),
+                    classes: classes.substring(0, 60),
+                    tag: tag,
+                });
+            }
+        }
+
+        // Elementos com classes relacionadas a vídeo/player
+        if (mediaClass.test(el.getAttribute('class') || '')) {
+            const i = mediaIndex++;
+            if (i < 10) {
+                result.divs_with_video_class.push({
+                    index: i,
+                    tag: tag,
+                    classes: className(el).substring(0, 80),
+                    id: el.id || '',
+                });
+            }
+        }
+    }
+
+    return result;
+};
+"""
+
+# Botões de login como união CSS: uma única consulta ao DOM em vez de um loop
+LOGIN_BTN = (
+    "button:has-text('Log in with DJI'), button:has-text('Login with DJI'), "
+    "a:has-text('Log in with DJI'), a:has-text('Login with DJI'), "
+    "button:has-text('Log in'), button:has-text('Login')"
+)
+SUBMIT_BTN = (
+    "button[type='submit'], button:has-text('Log in'), button:has-text('Sign in'), "
+    ".submit-btn, #login-btn"
+)
+
 print("=" * 60)
 print(" TESTE LOGIN DJI AG - FLUXO CORRETO")
 print("=" * 60)
@@ -37,255 +385,58 @@ print(f"Email: {USERNAME}")
 print(f"Senha: {'*' * len(PASSWORD)}")
 print()
 
-from playwright.sync_api import sync_playwright
-
-# Diretório para perfil persistente do browser
-# Usar perfil fixo para manter sessão entre execuções
-USER_DATA_DIR = os.path.join(os.path.dirname(__file__), "browser_profile")
-os.makedirs(USER_DATA_DIR, exist_ok=True)
-print(f"Perfil: {USER_DATA_DIR}")
 
-with sync_playwright() as p:
+def disable_playwright_stack_capture():
+    """
+    Desliga o inspect.stack() que o Playwright executa a cada chamada da API
+    (só metadados de debug). Troca apenas a referência ao módulo inspect dentro
+    de playwright._impl._connection; o inspect global fica intacto.
+    """
+    try:
+        from playwright._impl import _connection
+    except ImportError:
+        return
+    if getattr(_connection, "inspect", None) is not inspect:
+        return  # já aplicado ou estrutura interna diferente
     
-    # ============================================================
-    # INICIAR BROWSER
-    # ============================================================
-    print("🚀 Iniciando browser...")
-    context = p.chromium.launch_persistent_context(
-        user_data_dir=USER_DATA_DIR,
-        headless=False,
-        slow_mo=100,
-        args=["--disable-blink-features=AutomationControlled"],
-        ignore_default_args=["--enable-automation"],
-        viewport={"width": 1280, "height": 800},
+    _connection.inspect = types.SimpleNamespace(
+        **{name: getattr(inspect, name) for name in dir(inspect) if not name.startswith("__")},
     )
-    
-    page = context.pages[0] if context.pages else context.new_page()
-    
-    # Script anti-detecção
-    page.add_init_script("""
-        Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
-    """)
-    
-    # ============================================================
-    # ETAPA 1: Acessar djiag.com/br/records
-    # ============================================================
-    print("\n📍 ETAPA 1: Acessando https://www.djiag.com/br/records ...")
-    page.goto("https://www.djiag.com/br/records", timeout=60000, wait_until="networkidle")
-    
-    # Aguardar estabilização da página (pode redirecionar)
-    time.sleep(5)
-    
-    # Verificar URL após carregamento completo
-    current_url = page.url
-    print(f"   URL após carregamento: {current_url}")
-    
-    # ============================================================
-    # ETAPA 2: Verificar se precisa login
-    # ============================================================
-    print("\n📍 ETAPA 2: Verificando se precisa login...")
-    
-    # Se a URL contém /login, precisamos fazer login
-    needs_login = "/login" in current_url
-    
-    if not needs_login:
-        print("   ✅ Parece autenticado, verificando página...")
-    else:
-        print("   ⚠️ Página de login detectada. Iniciando processo de login...")
-    
-    # Se precisa login, executar o processo
-    if needs_login:
-        # Aceitar cookies se aparecer
-        try:
-            cookies_btn = page.locator("button:has-text('Accept'), button:has-text('Aceitar')").first
-            if cookies_btn.is_visible(timeout=2000):
-                cookies_btn.click()
-                print("   ✅ Cookies aceitos")
-                time.sleep(1)
-        except:
-            pass
-        
-        # Procurar checkbox "I have read..."
-        try:
-            checkbox = page.locator("input[type='checkbox']").first
-            if checkbox.is_visible(timeout=5000):
-                checkbox.click()
-                print("   ✅ Checkbox 'I have read...' marcado")
-                time.sleep(1)
-        except Exception as e:
-            print(f"   ℹ️ Checkbox não encontrado ou não visível")
-        
-        # Procurar botão "Login with DJI account"
-        try:
-            # Tentar vários seletores
-            selectors = [
-                "button:has-text('Log in with DJI')",
-                "button:has-text('Login with DJI')", 
-                "a:has-text('Log in with DJI')",
-                "a:has-text('Login with DJI')",
-                "[class*='login']",
-                "button:has-text('Log in')",
-                "button:has-text('Login')",
-            ]
-            
-            clicked = False
-            for selector in selectors:
-                try:
-                    btn = page.locator(selector).first
-                    if btn.is_visible(timeout=2000):
-                        btn.click()
-                        print(f"   ✅ Botão clicado: {selector}")
-                        clicked = True
-                        break
-                except:
-                    continue
-            
-            if not clicked:
-                print("   ⚠️ Nenhum botão de login encontrado")
-            
-            time.sleep(3)
-        except Exception as e:
-            print(f"   ⚠️ Erro procurando botão: {e}")
-        
-        current_url = page.url
-        print(f"   URL após clique: {current_url}")
-        
-        # Aguardar página do account.dji.com carregar
-        time.sleep(3)
-        current_url = page.url
-        print(f"   URL atual: {current_url}")
+    _connection.inspect.stack = lambda *args, **kwargs: []
+
+
+# PW_INSPECT_STACK=1 mantém os stack traces completos do Playwright para depuração
+if os.environ.get("PW_INSPECT_STACK", "0") != "1":
+    disable_playwright_stack_capture()
+
+# Sessão salva (cookies + localStorage) entre execuções.
+# Bem mais leve que montar um perfil persistente completo do Chromium.
+AUTH_STATE_PATH = BASE_DIR / "auth_state.json"
+has_auth_state = AUTH_STATE_PATH.exists()
+print(f"Sessão: {AUTH_STATE_PATH} ({'encontrada' if has_auth_state else 'nova'})")
+
+async def main():
+    """Fluxo completo no async_playwright: capturas e gravações podem se sobrepor"""
+    async with async_playwright() as p:
         
         # ============================================================
-        # ETAPA 3: Preencher credenciais no account.dji.com
+        # INICIAR BROWSER
         # ============================================================
-        print("\n📍 ETAPA 3: Preenchendo credenciais...")
-        
-        if "account.dji.com" in current_url:
-            print("   📍 Estamos no account.dji.com")
-            
-            # Aguardar formulário de login aparecer
-            time.sleep(2)
-            
-            # Campo de email
-            try:
-                email_field = page.locator("input[name='username'], input[type='email'], input[type='text']").first
-                if email_field.is_visible(timeout=5000):
-                    email_field.click()
-                    time.sleep(0.3)
-                    email_field.type(USERNAME, delay=30)
-                    print("   ✅ Email preenchido")
-                    time.sleep(0.5)
-            except Exception as e:
-                print(f"   ❌ Erro no email: {e}")
-            
-            # Campo de senha
-            try:
-                pass_field = page.locator("input[type='password']").first
-                if pass_field.is_visible(timeout=3000):
-                    pass_field.click()
-                    time.sleep(0.3)
-                    pass_field.type(PASSWORD, delay=30)
-                    print("   ✅ Senha preenchida")
-                    time.sleep(0.5)
-            except Exception as e:
-                print(f"   ❌ Erro na senha: {e}")
-            
-            # Clicar em Login - tentar vários seletores
-            print("   🖱️ Procurando botão de login...")
-            clicked = False
-            
-            login_selectors = [
-                "button[type='submit']",
-                "button:has-text('Log in')",
-                "button:has-text('Login')",
-                "button:has-text('Sign in')",
-                ".submit-btn",
-                "#login-btn",
-            ]
-            
-            for selector in login_selectors:
-                try:
-                    btn = page.locator(selector).first
-                    if btn.is_visible(timeout=1000):
-                        btn.click()
-                        print(f"   ✅ Botão Login clicado: {selector}")
-                        clicked = True
-                        break
-                except:
-                    continue
-            
-            if not clicked:
-                # Tentar pressionar Enter no campo de senha
-                try:
-                    pass_field = page.locator("input[type='password']").first
-                    pass_field.press("Enter")
-                    print("   ✅ Enter pressionado no campo de senha")
-                    clicked = True
-                except:
-                    print("   ❌ Não foi possível clicar no botão de login")
-            
-            # Aguardar redirecionamento
-            print("\n   ⏳ Aguardando redirecionamento...")
-            print("   💡 Se aparecer CAPTCHA, complete manualmente!")
-            
-            for i in range(60):
-                time.sleep(1)
-                current_url = page.url
-                if "account.dji.com/login" not in current_url and "account.dji.com/logout" not in current_url:
-                    print(f"   ✅ Redirecionado para: {current_url}")
-                    break
-                if i % 10 == 0 and i > 0:
-                    print(f"   ⏳ Aguardando... ({i}s)")
-        else:
-            print(f"   ⚠️ Não estamos no account.dji.com. URL: {current_url}")
-    
-    # ============================================================
-    # ETAPA 4: Garantir que estamos em /records
-    # ============================================================
-    print("\n📍 ETAPA 4: Verificando se estamos em /records...")
-    
-    current_url = page.url
-    
-    # Só navegar se não estiver em /records
-    if "/records" not in current_url or "/login" in current_url:
-        print(f"   URL atual: {current_url}")
-        print("   🔄 Navegando para /records...")
-        page.goto("https://www.djiag.com/br/records", timeout=60000, wait_until="networkidle")
-        time.sleep(3)
-        current_url = page.url
-    
-    print(f"   URL: {current_url}")
-    
-    # Se ainda não está em /records, tentar novamente
-    max_attempts = 3
-    for attempt in range(max_attempts):
-        if "/records" in current_url and "/login" not in current_url:
-            break
+        print("🚀 Iniciando browser...")
+        browser = await p.chromium.launch(
+            headless=False,
+            args=["--disable-blink-features=AutomationControlled"],
+            ignore_default_args=["--enable-automation"],
+        )
+        context = await browser.new_context(
+            storage_state=AUTH_STATE_PATH if has_auth_state else None,
+            viewport={"width": 1280, "height": 800},
+        )
         
-        print(f"   ⚠️ Não está em /records (tentativa {attempt + 1}/{max_attempts})")
+        await context.route("**/*", block_assets)
         
-        # Se está em /mission ou outra página, navegar para /records
-        if "/login" not in current_url:
-            print("   🔄 Redirecionando para /records...")
-            page.goto("https://www.djiag.com/br/records", timeout=60000, wait_until="networkidle")
-            time.sleep(3)
-            current_url = page.url
-            print(f"   URL: {current_url}")
-        else:
-            # Ainda em login, falhou
-            break
-    
-    final_url = page.url
-    print(f"   URL final: {final_url}")
-    
-    if "/records" in final_url and "/login" not in final_url:
-        print("\n" + "=" * 60)
-        print(" ✅ LOGIN BEM-SUCEDIDO! Redirecionado para /records")
-        print("=" * 60)
-        
-        # ============================================================
-        # Capturar TODAS as requisições de API durante carregamento
-        # ============================================================
+        # Capturar TODAS as requisições de API desde a primeira navegação,
+        # sem precisar recarregar /records só para observá-las
         all_api_calls = []
         
         def capture_all_requests(request):
@@ -299,697 +450,642 @@ with sync_playwright() as p:
                 })
                 print(f"   📡 API: {request.method} {url}")
         
-        page.on("request", capture_all_requests)
+        context.on("request", capture_all_requests)
         
-        # Esperar a página carregar completamente e capturar APIs
-        print("\n📊 Capturando chamadas de API...")
-        time.sleep(3)
+        # Mídia por aba (URL -> content-type), registrada antes de qualquer clique em
+        # Playback: a primeira navegação de cada aba já é capturada. O route registra
+        # as URLs de MEDIA_RE já na requisição (content-type ainda desconhecido); o
+        # listener de resposta preenche o content-type e pega também o que só se
+        # reconhece por ele (video/*, octet-stream)
+        media_by_page = {}
         
-        # Recarregar para capturar todas as chamadas
-        print("   🔄 Recarregando página para capturar APIs...")
-        page.reload()
-        page.wait_for_load_state("networkidle", timeout=30000)
-        time.sleep(2)
+        def media_of(request_or_response):
+            try:
+                return media_by_page.setdefault(request_or_response.frame.page, {})
+            except Exception:
+                return None  # requisições de service worker não têm frame
         
-        page.remove_listener("request", capture_all_requests)
+        async def capture_media(route):
+            request = route.request
+            media = media_of(request)
+            if media is not None:
+                # Por URL: a mesma mídia não é baixada duas vezes
+                media.setdefault(request.url, "")
+            await route.fallback()  # segue para block_assets
         
-        # Salvar APIs capturadas
-        download_path = os.path.join(os.path.dirname(__file__), "downloads")
-        os.makedirs(download_path, exist_ok=True)
+        def capture_media_response(response):
+            content_type = response.headers.get('content-type', '')
+            if is_media_response(response.url, content_type):
+                media = media_of(response)
+                if media is not None:
+                    media[response.url] = content_type
         
-        if all_api_calls:
-            apis_path = os.path.join(download_path, "all_apis.json")
-            with open(apis_path, "w", encoding="utf-8") as f:
-                json.dump(all_api_calls, f, indent=2, ensure_ascii=False)
-            print(f"\n   ✅ {len(all_api_calls)} APIs capturadas e salvas em: {apis_path}")
+        await context.route(MEDIA_RE, capture_media)
+        context.on("response", capture_media_response)
         
-        # Salvar screenshot da página de records
-        screenshot_path = os.path.join(os.path.dirname(__file__), "records_page.png")
-        page.screenshot(path=screenshot_path, full_page=True)
-        print(f"   📸 Screenshot salvo: {screenshot_path}")
+        page = await context.new_page()
         
-        # Salvar HTML para análise
-        html = page.content()
-        html_path = os.path.join(os.path.dirname(__file__), "records_page.html")
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write(html)
-        print(f"   📄 HTML salvo: {html_path}")
+        # Script anti-detecção
+        await context.add_init_script("""
+            Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
+        """)
+        await context.add_init_script(RECORD_ANALYSIS_JS)
         
         # ============================================================
-        # ETAPA 5: Download via clique no botão DownloadAll
-        # (API requer assinatura WebAssembly, não pode ser feita via request)
+        # ETAPA 1: Acessar djiag.com/br/records
         # ============================================================
-        print("\n📍 ETAPA 5: Download automático...")
-        print(f"   📁 Diretório de downloads: {download_path}")
-        
-        # Extrair e salvar cookies para uso futuro
-        print("   🍪 Extraindo cookies da sessão...")
-        browser_cookies = context.cookies()
-        cookies_path = os.path.join(download_path, "session_cookies.json")
-        with open(cookies_path, "w", encoding="utf-8") as f:
-            json.dump(browser_cookies, f, indent=2, ensure_ascii=False)
-        print(f"   ✅ {len(browser_cookies)} cookies salvos")
+        print("\n📍 ETAPA 1: Acessando https://www.djiag.com/br/records ...")
+        await page.goto("https://www.djiag.com/br/records", timeout=60000, wait_until="domcontentloaded")
         
-        # Capturar API de export durante o clique
-        export_apis = []
+        # Com sessão salva, uma chamada autenticada (mesmos cookies do browser)
+        # confirma o login sem esperar o SPA decidir se redireciona.
+        # Resultado inconclusivo cai na verificação pela página (URL/DOM) abaixo
+        session_ok = False
+        if has_auth_state:
+            session_ok = await probe_session(page.request)
+            print(f"   🔑 Sessão salva {'válida' if session_ok else 'não confirmada, verificando pela página'}")
         
-        def on_export_request(request):
-            url = request.url
-            # Capturar qualquer requisição que não seja estática
-            if "djiag.com" in url and not any(x in url for x in ['.js', '.css', '.png', '.svg', '.woff']):
-                export_apis.append({
-                    "method": request.method,
-                    "url": url,
-                    "headers": dict(request.headers),
-                    "post_data": request.post_data,
-                    "resource_type": request.resource_type,
-                })
-                print(f"      📡 {request.resource_type}: {request.method} {url[:80]}")
+        if not session_ok:
+            # Segue assim que a aba List (logado) ou o checkbox do login (deslogado) existir
+            try:
+                await page.wait_for_selector(RECORDS_OR_LOGIN_SELECTOR, timeout=30000)
+            except Exception:
+                pass
+            
+            # Aguardar estabilização da página (pode redirecionar)
+            try:
+                await page.wait_for_url(lambda u: "/login" in u or "/records" in u, timeout=15000)
+            except Exception:
+                pass
         
-        page.on("request", on_export_request)
+        # Verificar URL após carregamento completo
+        current_url = page.url
+        print(f"   URL após carregamento: {current_url}")
         
         # ============================================================
-        # Clicar no botão "List" para mostrar a lista de records
+        # ETAPA 2: Verificar se precisa login
         # ============================================================
-        print("\n   🔄 Clicando no botão 'List' para mostrar a lista...")
+        print("\n📍 ETAPA 2: Verificando se precisa login...")
         
-        list_btn_clicked = False
-        list_selectors = [
-            "div[role='tab']:has-text('List')",
-            ".ant-tabs-tab:has-text('List')",
-            "div.ant-tabs-tab-btn:has-text('List')",
-            "[class*='tab']:has-text('List')",
-        ]
+        # Se a URL contém /login, precisamos fazer login
+        needs_login = not session_ok and "/login" in current_url
         
-        for selector in list_selectors:
-            try:
-                btn = page.locator(selector).first
-                if btn.is_visible(timeout=2000):
-                    btn.click()
-                    print(f"   ✅ Botão 'List' clicado: {selector}")
-                    list_btn_clicked = True
-                    time.sleep(2)  # Aguardar lista carregar
-                    break
-            except:
-                continue
+        if not needs_login:
+            print("   ✅ Parece autenticado, verificando página...")
+        else:
+            print("   ⚠️ Página de login detectada. Iniciando processo de login...")
         
-        if not list_btn_clicked:
-            print("   ⚠️ Botão 'List' não encontrado, tentando via texto...")
+        # Se precisa login, executar o processo
+        if needs_login:
+            # Aceitar cookies se aparecer
             try:
-                page.get_by_text("List", exact=True).click()
-                print("   ✅ Botão 'List' clicado via texto")
-                time.sleep(2)
+                cookies_btn = page.locator("button:has-text('Accept'), button:has-text('Aceitar')").first
+                if await cookies_btn.is_visible(timeout=2000):
+                    await cookies_btn.click()
+                    print("   ✅ Cookies aceitos")
             except:
-                print("   ⚠️ Não foi possível clicar em 'List'")
+                pass
+            
+            # Procurar checkbox "I have read..."
+            try:
+                checkbox = page.locator("input[type='checkbox']").first
+                if await checkbox.is_visible(timeout=5000):
+                    await checkbox.click()
+                    print("   ✅ Checkbox 'I have read...' marcado")
+            except Exception as e:
+                print(f"   ℹ️ Checkbox não encontrado ou não visível")
+            
+            # Procurar botão "Login with DJI account"
+            try:
+                await page.locator(f"{LOGIN_BTN} >> visible=true").first.click(timeout=5000)
+                print("   ✅ Botão de login clicado")
+            except Exception:
+                print("   ⚠️ Nenhum botão de login encontrado")
+            
+            current_url = page.url
+            print(f"   URL após clique: {current_url}")
+            
+            # Aguardar página do account.dji.com carregar
+            try:
+                await page.wait_for_url(lambda u: "account.dji.com" in u, timeout=10000)
+            except Exception:
+                pass
+            current_url = page.url
+            print(f"   URL atual: {current_url}")
+            
+            # ============================================================
+            # ETAPA 3: Preencher credenciais no account.dji.com
+            # ============================================================
+            print("\n📍 ETAPA 3: Preenchendo credenciais...")
+            
+            if "account.dji.com" in current_url:
+                print("   📍 Estamos no account.dji.com")
+                
+                # Handles reaproveitados no preenchimento e no fallback do Enter
+                pass_loc = page.locator("input[type='password']").first
+                
+                # Campo de email (aguarda o formulário aparecer)
+                try:
+                    email_field = page.locator("input[name='username'], input[type='email'], input[type='text']").first
+                    await email_field.wait_for(state="visible", timeout=5000)
+                    await email_field.fill(USERNAME)
+                    print("   ✅ Email preenchido")
+                except Exception as e:
+                    print(f"   ❌ Erro no email: {e}")
+                
+                # Campo de senha
+                try:
+                    await pass_loc.wait_for(state="visible", timeout=3000)
+                    await pass_loc.fill(PASSWORD)
+                    print("   ✅ Senha preenchida")
+                except Exception as e:
+                    print(f"   ❌ Erro na senha: {e}")
+                
+                # Clicar em Login
+                print("   🖱️ Procurando botão de login...")
+                clicked = False
+                try:
+                    await page.locator(f"{SUBMIT_BTN} >> visible=true").first.click(timeout=5000)
+                    print("   ✅ Botão Login clicado")
+                    clicked = True
+                except Exception:
+                    pass
+                
+                if not clicked:
+                    # Tentar pressionar Enter no campo de senha
+                    try:
+                        await pass_loc.press("Enter")
+                        print("   ✅ Enter pressionado no campo de senha")
+                        clicked = True
+                    except:
+                        print("   ❌ Não foi possível clicar no botão de login")
+                
+                # Aguardar redirecionamento
+                print("\n   ⏳ Aguardando redirecionamento...")
+                print("   💡 Se aparecer CAPTCHA, complete manualmente!")
+                
+                # Resolve no evento de navegação, sem polling
+                try:
+                    await page.wait_for_url(
+                        lambda u: "account.dji.com/login" not in u and "account.dji.com/logout" not in u,
+                        timeout=60000,
+                    )
+                    print(f"   ✅ Redirecionado para: {page.url}")
+                except PlaywrightTimeoutError:
+                    print("   ⚠️ Sem redirecionamento em 60s (CAPTCHA? ajuda manual necessária)")
+            else:
+                print(f"   ⚠️ Não estamos no account.dji.com. URL: {current_url}")
         
-        # Listar todos os botões para encontrar o de export
-        print("\n   📋 Listando botões da página...")
-        buttons_info = page.evaluate("""
-            () => {
-                const buttons = [];
-                document.querySelectorAll('button, a[role="button"], [class*="btn"], [class*="button"]').forEach((btn, i) => {
-                    if (i < 30) {
-                        const text = btn.textContent.trim().substring(0, 50);
-                        const classes = btn.className || '';
-                        const hasIcon = btn.querySelector('svg') !== null;
-                        buttons.push({
-                            index: i,
-                            text: text,
-                            classes: classes.substring(0, 80),
-                            tag: btn.tagName,
-                            hasIcon: hasIcon,
-                        });
-                    }
-                });
-                return buttons;
-            }
-        """)
+        # ============================================================
+        # ETAPA 4: Garantir que estamos em /records
+        # ============================================================
+        print("\n📍 ETAPA 4: Verificando se estamos em /records...")
         
-        for btn in buttons_info:
-            if btn.get('text') or 'export' in btn.get('classes', '').lower() or 'download' in btn.get('classes', '').lower():
-                print(f"      [{btn['index']}] {btn['tag']}: '{btn['text']}' | classes: {btn['classes'][:40]}")
+        current_url = page.url
         
-        # Procurar botão DownloadAll especificamente
-        print("\n   🖱️ Procurando botão DownloadAll...")
+        # Uma navegação só, e apenas se não estiver em /records: sem retentativas
+        if "/records" not in current_url or "/login" in current_url:
+            print(f"   URL atual: {current_url}")
+            print("   🔄 Navegando para /records...")
+            await page.goto("https://www.djiag.com/br/records", timeout=60000, wait_until="domcontentloaded")
+            try:
+                await page.wait_for_selector(RECORDS_TAB_SELECTOR, timeout=20000)
+            except PlaywrightTimeoutError:
+                print("   ❌ Aba List não apareceu em /records")
         
-        download_btn = None
-        for btn in buttons_info:
-            if 'downloadall' in btn.get('text', '').lower().replace(' ', ''):
-                download_btn = btn
-                break
+        final_url = page.url
+        print(f"   URL final: {final_url}")
         
-        if download_btn:
-            print(f"   ✅ Botão encontrado: [{download_btn['index']}] '{download_btn['text']}'")
+        if "/records" in final_url and "/login" not in final_url:
+            print("\n" + "=" * 60)
+            print(" ✅ LOGIN BEM-SUCEDIDO! Redirecionado para /records")
+            print("=" * 60)
+            
+            # Salvar sessão para as próximas execuções pularem o login
+            await context.storage_state(path=AUTH_STATE_PATH)
+            print(f"   💾 Sessão salva em: {AUTH_STATE_PATH}")
+            
+            # Parar a captura iniciada antes da primeira navegação
+            context.remove_listener("request", capture_all_requests)
+            
+            # Salvar APIs capturadas
+            download_path = DOWNLOAD_DIR
+            download_path.mkdir(exist_ok=True)
+            
+            if all_api_calls:
+                apis_path = download_path / "all_apis.json"
+                write_json(apis_path, all_api_calls)
+                print(f"\n   ✅ {len(all_api_calls)} APIs capturadas e salvas em: {apis_path}")
+            
+            if DEBUG_DUMP:
+                # Screenshot só da viewport, em JPEG (bem menor que PNG da página inteira),
+                # e o HTML (gzip) para análise: as duas capturas rodam em paralelo
+                screenshot_path = BASE_DIR / "records_page.jpg"
+                html_path = BASE_DIR / "records_page.html.gz"
+                _, html = await asyncio.gather(
+                    page.screenshot(path=screenshot_path, full_page=False, type="jpeg", quality=60),
+                    page.content(),
+                )
+                print(f"   📸 Screenshot salvo: {screenshot_path}")
+                
+                with gzip.open(html_path, "wt", encoding="utf-8", compresslevel=4) as f:
+                    f.write(html)
+                print(f"   📄 HTML salvo: {html_path}")
+            
+            # ============================================================
+            # ETAPA 5: Download via clique no botão DownloadAll
+            # (API requer assinatura WebAssembly, não pode ser feita via request)
+            # ============================================================
+            print("\n📍 ETAPA 5: Download automático...")
+            print(f"   📁 Diretório de downloads: {download_path}")
+            
+            # Extrair e salvar cookies para uso futuro
+            print("   🍪 Extraindo cookies da sessão...")
+            # Só os domínios da sessão DJI (sem os de analytics)
+            browser_cookies = await context.cookies(SESSION_COOKIE_URLS)
+            cookies_path = download_path / "session_cookies.json"
+            write_json(cookies_path, browser_cookies)
+            print(f"   ✅ {len(browser_cookies)} cookies salvos")
             
-            # Usar expect_download para capturar o arquivo
-            all_buttons = page.locator('button, a[role="button"], [class*="btn"], [class*="button"]').all()
+            # Capturar API de export durante o clique
+            export_apis = []
             
-            if download_btn['index'] < len(all_buttons):
+            def on_export_request(request):
+                url = request.url
+                # Capturar qualquer requisição que não seja estática
+                if "djiag.com" in url and not any(x in url for x in ['.js', '.css', '.png', '.svg', '.woff']):
+                    export_apis.append({
+                        "method": request.method,
+                        "url": url,
+                        "headers": dict(request.headers),
+                        "post_data": request.post_data,
+                        "resource_type": request.resource_type,
+                    })
+                    print(f"      📡 {request.resource_type}: {request.method} {url[:80]}")
+            
+            # No context, registrado antes do clique em List: nenhuma XHR escapa
+            context.on("request", on_export_request)
+            
+            # ============================================================
+            # Clicar no botão "List" para mostrar a lista de records
+            # ============================================================
+            print("\n   🔄 Clicando no botão 'List' para mostrar a lista...")
+            
+            list_btn_clicked = False
+            list_selectors = [
+                "div[role='tab']:has-text('List')",
+                ".ant-tabs-tab:has-text('List')",
+                "div.ant-tabs-tab-btn:has-text('List')",
+                "[class*='tab']:has-text('List')",
+            ]
+            
+            for selector in list_selectors:
                 try:
-                    with page.expect_download(timeout=60000) as download_info:
+                    btn = page.locator(selector).first
+                    if await btn.is_visible(timeout=2000):
+                        await btn.click()
+                        print(f"   ✅ Botão 'List' clicado: {selector}")
+                        list_btn_clicked = True
+                        break
+                except:
+                    continue
+            
+            if not list_btn_clicked:
+                print("   ⚠️ Botão 'List' não encontrado, tentando via texto...")
+                try:
+                    await page.get_by_text("List", exact=True).click()
+                    print("   ✅ Botão 'List' clicado via texto")
+                except:
+                    print("   ⚠️ Não foi possível clicar em 'List'")
+            
+            # Aguardar lista carregar
+            try:
+                await page.wait_for_selector(LIST_ROW_SEL, timeout=10000)
+            except Exception:
+                pass
+            
+            # Exploração da página (botões, itens da lista, coluna Operation) só para
+            # redescobrir seletores quando o layout mudar
+            page_data = None
+            if DEBUG_DISCOVER:
+                print("\n   📋 Listando botões da página...")
+                page_data = await page.evaluate(PAGE_INTROSPECT_JS)
+                for btn in page_data["buttons"]:
+                    if btn.get('text') or 'export' in btn.get('classes', '').lower() or 'download' in btn.get('classes', '').lower():
+                        print(f"      [{btn['index']}] {btn['tag']}: '{btn['text']}' | classes: {btn['classes'][:40]}")
+            
+            # Procurar botão DownloadAll especificamente
+            print("\n   🖱️ Procurando botão DownloadAll...")
+            
+            download_btn = page.locator(BUTTON_CANDIDATES_SEL).filter(has_text=DOWNLOAD_ALL_RE).first
+            
+            if await download_btn.count():
+                print(f"   ✅ Botão encontrado: '{(await download_btn.inner_text()).strip()}'")
+                
+                # Usar expect_download para capturar o arquivo
+                try:
+                    async with page.expect_download(timeout=60000) as download_info:
                         print("   🖱️ Clicando no botão...")
-                        all_buttons[download_btn['index']].click()
+                        await download_btn.click()
                     
-                    download = download_info.value
+                    download = await download_info.value
                     filename = download.suggested_filename
-                    filepath = os.path.join(download_path, filename)
-                    download.save_as(filepath)
+                    filepath = download_path / filename
+                    await download.save_as(filepath)
                     print(f"\n   ✅ DOWNLOAD CONCLUÍDO!")
                     print(f"   📁 Arquivo: {filename}")
                     print(f"   📂 Caminho: {filepath}")
                     
                     # Verificar tamanho
-                    file_size = os.path.getsize(filepath)
+                    file_size = filepath.stat().st_size
                     print(f"   📦 Tamanho: {file_size:,} bytes")
                     
                 except Exception as e:
                     print(f"   ❌ Erro no download: {e}")
-        else:
-            print("   ⚠️ Botão DownloadAll não encontrado")
-        
-        page.remove_listener("request", on_export_request)
-        
-        # Salvar APIs de export capturadas
-        if export_apis:
-            export_path = os.path.join(download_path, "export_apis.json")
-            with open(export_path, "w", encoding="utf-8") as f:
-                json.dump(export_apis, f, indent=2, ensure_ascii=False)
-            print(f"\n   📡 {len(export_apis)} APIs de export capturadas: {export_path}")
-        
-        print("\n   ✅ ETAPA 5 concluída!")
-        
-        # ============================================================
-        # ETAPA 6: Mapear e baixar records individuais
-        # ============================================================
-        print("\n📍 ETAPA 6: Mapeando records individuais...")
-        
-        # Criar pasta para records individuais
-        records_path = os.path.join(download_path, "records")
-        os.makedirs(records_path, exist_ok=True)
-        print(f"   📁 Pasta de records: {records_path}")
-        
-        # Aguardar lista carregar após o download
-        time.sleep(2)
-        
-        # Identificar itens da lista
-        print("\n   🔍 Identificando itens da lista...")
-        
-        list_items = page.evaluate("""
-            () => {
-                const items = [];
-                // Procurar linhas da tabela ou itens de lista
-                const selectors = [
-                    'table tbody tr',
-                    '.ant-table-row',
-                    '[class*="list-item"]',
-                    '[class*="record-item"]',
-                    '[class*="task-item"]',
-                ];
-                
-                for (const selector of selectors) {
-                    const rows = document.querySelectorAll(selector);
-                    if (rows.length > 0) {
-                        rows.forEach((row, i) => {
-                            // Procurar botão de visualização na linha
-                            const viewBtn = row.querySelector('button, a, [class*="view"], [class*="detail"], svg');
-                            const text = row.textContent.trim().substring(0, 100);
-                            items.push({
-                                index: i,
-                                selector: selector,
-                                text: text,
-                                hasViewButton: viewBtn !== null,
-                            });
-                        });
-                        break;
-                    }
-                }
-                return items;
-            }
-        """)
-        
-        print(f"   📊 Encontrados {len(list_items)} itens na lista")
-        
-        if list_items:
-            # Mostrar primeiros itens
-            for item in list_items[:5]:
-                print(f"      [{item['index']}] {item['text'][:60]}...")
+            else:
+                print("   ⚠️ Botão DownloadAll não encontrado")
             
-            if len(list_items) > 5:
-                print(f"      ... e mais {len(list_items) - 5} itens")
-        
-        # Mapear estrutura dos botões de visualização
-        print("\n   🔍 Mapeando estrutura da lista...")
-        
-        # Tentar identificar a estrutura real da lista
-        list_structure = page.evaluate("""
-            () => {
-                const result = {
-                    rows: [],
-                    selectors_found: [],
-                };
+            context.remove_listener("request", on_export_request)
+            
+            # Salvar APIs de export capturadas
+            if export_apis:
+                export_path = download_path / "export_apis.json"
+                write_json(export_path, export_apis)
+                print(f"\n   📡 {len(export_apis)} APIs de export capturadas: {export_path}")
+            
+            print("\n   ✅ ETAPA 5 concluída!")
+            
+            # ============================================================
+            # ETAPA 6: Mapear e baixar records individuais
+            # ============================================================
+            print("\n📍 ETAPA 6: Mapeando records individuais...")
+            
+            # Criar pasta para records individuais
+            records_path = RECORDS_DIR
+            records_path.mkdir(parents=True, exist_ok=True)
+            print(f"   📁 Pasta de records: {records_path}")
+            
+            if page_data:
+                # Identificar itens da lista (já coletados na varredura da ETAPA 5)
+                print("\n   🔍 Identificando itens da lista...")
+                list_items = page_data["listItems"]
                 
-                // Tentar diferentes seletores
-                const selectors = [
-                    '.ant-table-row',
-                    'table tbody tr',
-                    '[class*="list"] [class*="item"]',
-                    '[class*="record"]',
-                    '[class*="task-row"]',
-                ];
+                print(f"   📊 Encontrados {len(list_items)} itens na lista")
                 
-                for (const selector of selectors) {
-                    const elements = document.querySelectorAll(selector);
-                    if (elements.length > 0) {
-                        result.selectors_found.push({selector, count: elements.length});
-                        
-                        elements.forEach((el, i) => {
-                            if (i < 5) {  // Apenas primeiros 5 para debug
-                                const classes = typeof el.className === 'string' ? el.className : '';
-                                result.rows.push({
-                                    index: i,
-                                    selector: selector,
-                                    tagName: el.tagName,
-                                    classes: classes.substring(0, 80),
-                                    text: (el.textContent || '').trim().substring(0, 80),
-                                    isClickable: el.onclick !== null || el.tagName === 'A' || el.style.cursor === 'pointer',
-                                    childButtons: el.querySelectorAll('button, a, [role="button"]').length,
-                                });
-                            }
-                        });
-                    }
-                }
+                if list_items:
+                    # Mostrar primeiros itens
+                    for item in list_items[:5]:
+                        print(f"      [{item['index']}] {item['text'][:60]}...")
+                    
+                    if len(list_items) > 5:
+                        print(f"      ... e mais {len(list_items) - 5} itens")
                 
-                return result;
-            }
-        """)
-        
-        print(f"   📊 Seletores encontrados:")
-        for sel in list_structure.get('selectors_found', []):
-            print(f"      {sel['selector']}: {sel['count']} elementos")
-        
-        if list_structure.get('rows'):
-            print(f"\n   📋 Estrutura das primeiras linhas:")
-            for row in list_structure['rows'][:3]:
-                print(f"      [{row['index']}] {row['tagName']} | botões: {row['childButtons']} | classes: {row['classes'][:40]}")
-        
-        # Verificar se há linhas clicáveis na tabela
-        # O botão de Playback está na última coluna (Operation)
-        print(f"\n   📍 Procurando botões de Playback na coluna Operation...")
-        
-        # Investigar estrutura detalhada das linhas
-        row_structure = page.evaluate("""
-            () => {
-                const rows = document.querySelectorAll('.ant-table-row');
-                const result = [];
+                # Mapear estrutura dos botões de visualização
+                print("\n   🔍 Mapeando estrutura da lista...")
                 
-                rows.forEach((row, i) => {
-                    if (i < 3) {  // Apenas primeiras 3 linhas
-                        const cells = row.querySelectorAll('td');
-                        const lastCell = cells[cells.length - 1];  // Última célula (Operation)
-                        
-                        // Procurar todos os elementos clicáveis na última célula
-                        const clickables = lastCell ? lastCell.querySelectorAll('span, button, a, svg, [role="button"]') : [];
-                        const clickableInfo = [];
-                        
-                        clickables.forEach((el, j) => {
-                            clickableInfo.push({
-                                index: j,
-                                tag: el.tagName,
-                                classes: typeof el.className === 'string' ? el.className.substring(0, 60) : '',
-                                title: el.getAttribute('title') || '',
-                                ariaLabel: el.getAttribute('aria-label') || '',
-                            });
-                        });
-                        
-                        result.push({
-                            rowIndex: i,
-                            totalCells: cells.length,
-                            lastCellClickables: clickableInfo,
-                            dataRowKey: row.getAttribute('data-row-key'),
-                        });
-                    }
-                });
+                list_structure = page_data["structure"]
                 
-                return result;
-            }
-        """)
-        
-        print(f"\n   📋 Estrutura da coluna Operation:")
-        for row in row_structure[:2]:
-            print(f"      Linha {row['rowIndex']}: {len(row['lastCellClickables'])} elementos clicáveis")
-            for el in row['lastCellClickables'][:5]:
-                info = f"title='{el['title']}'" if el['title'] else f"classes='{el['classes'][:30]}'"
-                print(f"         [{el['index']}] {el['tag']}: {info}")
-        
-        # Testar clicar no botão de Playback
-        print("\n   🔬 Testando abertura do primeiro record via Playback...")
-        
-        try:
-            rows = page.locator('.ant-table-row').all()
-            print(f"   📊 Linhas encontradas: {len(rows)}")
+                print(f"   📊 Seletores encontrados:")
+                for sel in list_structure.get('selectors_found', []):
+                    print(f"      {sel['selector']}: {sel['count']} elementos")
+                
+                if list_structure.get('rows'):
+                    print(f"\n   📋 Estrutura das primeiras linhas:")
+                    for row in list_structure['rows'][:3]:
+                        print(f"      [{row['index']}] {row['tagName']} | botões: {row['childButtons']} | classes: {row['classes'][:40]}")
+                
+                # Verificar se há linhas clicáveis na tabela
+                # O botão de Playback está na última coluna (Operation)
+                print(f"\n   📍 Procurando botões de Playback na coluna Operation...")
+                
+                row_structure = page_data["rows"]
+                
+                print(f"\n   📋 Estrutura da coluna Operation:")
+                for row in row_structure[:2]:
+                    print(f"      Linha {row['rowIndex']}: {len(row['lastCellClickables'])} elementos clicáveis")
+                    for el in row['lastCellClickables'][:5]:
+                        info = f"title='{el['title']}'" if el['title'] else f"classes='{el['classes'][:30]}'"
+                        print(f"         [{el['index']}] {el['tag']}: {info}")
+            
+            # Abrir os records via Playback, cada um na sua aba
+            # A linha 0 é geralmente o header/grupo: começar na linha 1
+            row_keys = await page.evaluate(ROW_KEYS_JS)
+            record_keys = [key for key in row_keys[1:] if key][:PLAYBACK_RECORDS]
+            print(f"\n   🔬 Abrindo {len(record_keys)} record(s) via Playback ({PLAYBACK_CONCURRENCY} abas em paralelo)...")
+            
+            playback_semaphore = asyncio.Semaphore(PLAYBACK_CONCURRENCY)
+            # Um clique por vez: expect_page concorrentes pegariam a mesma aba nova
+            open_lock = asyncio.Lock()
             
-            if len(rows) > 1:
-                # A linha 0 é geralmente o header/grupo, usar linha 1
-                row_to_use = rows[1]
+            async def open_playback(key):
+                """Clica no Playback da linha e devolve a nova aba (None se nenhuma abrir)"""
+                # Ícones da última célula (Operation) da linha alvo, em um seletor só
+                row = f'{LIST_ROW_SEL}[data-row-key="{key}"]'
+                icons = page.locator(f"{row} {PLAYBACK_ICON_SEL}")
+                icon_count = await icons.count()
+                if not icon_count:
+                    # Tentar pegar todos os spans
+                    icons = page.locator(f"{row} td:last-child span")
+                    icon_count = await icons.count()
+                if not icon_count:
+                    return None
                 
-                # Pegar a última célula (Operation)
-                cells = row_to_use.locator('td').all()
-                print(f"   📋 Células na linha: {len(cells)}")
+                # O botão de Playback é o segundo ícone (índice 1)
+                playback_btn = icons.nth(1) if icon_count >= 2 else icons.first
                 
-                if cells:
-                    last_cell = cells[-1]
-                    
-                    # Procurar os spans com classe de ícone clicável
-                    icons = last_cell.locator('span.smart-ui-icon').all()
-                    print(f"   🔍 Ícones smart-ui-icon: {len(icons)}")
-                    
-                    if not icons:
-                        # Tentar pegar todos os spans
-                        icons = last_cell.locator('span').all()
-                        print(f"   🔍 Todos os spans: {len(icons)}")
-                    
-                    # O botão de Playback é o segundo ícone (índice 1)
-                    playback_btn = None
-                    if len(icons) >= 2:
-                        playback_btn = icons[1]  # Segundo ícone
-                        print(f"   ✅ Usando segundo ícone como Playback")
-                    elif len(icons) == 1:
-                        playback_btn = icons[0]
-                        print(f"   ⚠️ Apenas 1 ícone encontrado, usando ele")
+                # Ctrl+Click força abertura em nova aba; senão tenta o clique normal
+                async with open_lock:
+                    for modifiers in (["Control"], []):
+                        try:
+                            async with context.expect_page(timeout=10000) as new_page_info:
+                                await playback_btn.click(modifiers=modifiers)
+                            return await new_page_info.value
+                        except Exception:
+                            continue
+                return None
+            
+            async def process_record(index, key):
+                """Abre o Playback de um record, analisa a aba e baixa as mídias"""
+                async with playback_semaphore:
+                    try:
+                        new_page = await open_playback(key)
+                    except Exception as e:
+                        print(f"   ❌ [{index}] Erro ao abrir record {key}: {e}")
+                        return
+                    if new_page is None:
+                        print(f"   ⚠️ [{index}] Nenhuma aba de Playback abriu para {key}")
+                        return
                     
-                    if playback_btn:
-                        # Clicar com Ctrl para forçar abertura em nova aba
-                        print(f"   🖱️ Clicando no botão Playback (Ctrl+Click)...")
-                        
-                        # Contar páginas antes do clique
-                        pages_before = len(context.pages)
+                    try:
+                        await new_page.wait_for_load_state("domcontentloaded", timeout=60000)
+                        record_url = new_page.url
+                        print(f"   ✅ [{index}] Nova aba aberta: {record_url}")
                         
-                        # Ctrl+Click força abertura em nova aba
-                        playback_btn.click(modifiers=["Control"])
-                        time.sleep(3)  # Esperar abrir
-                        
-                        # Verificar se abriu nova aba
-                        pages_after = len(context.pages)
-                        print(f"   📊 Páginas antes: {pages_before}, depois: {pages_after}")
-                        
-                        if pages_after > pages_before:
-                            # Abriu nova aba
-                            new_page = context.pages[-1]
-                            new_page.wait_for_load_state("networkidle", timeout=60000)
-                            record_url = new_page.url
-                            print(f"   ✅ Nova aba aberta: {record_url}")
-                            is_new_tab = True
-                        else:
-                            # Tentar clique normal e esperar navegação
-                            print("   ⚠️ Ctrl+Click não abriu nova aba, tentando clique normal...")
-                            playback_btn.click()
-                            time.sleep(3)
-                            
-                            pages_after = len(context.pages)
-                            if pages_after > pages_before:
-                                new_page = context.pages[-1]
-                                new_page.wait_for_load_state("networkidle", timeout=60000)
-                                record_url = new_page.url
-                                print(f"   ✅ Nova aba aberta: {record_url}")
-                                is_new_tab = True
-                            else:
-                                page.wait_for_load_state("networkidle", timeout=30000)
-                                record_url = page.url
-                                print(f"   ✅ Navegou para: {record_url}")
-                                new_page = page
-                                is_new_tab = False
-                        
-                        # Salvar screenshot do record
-                        record_screenshot = os.path.join(records_path, "record_0_screenshot.png")
-                        new_page.screenshot(path=record_screenshot, full_page=True)
-                        print(f"   📸 Screenshot salvo: {record_screenshot}")
+                        # Analisar assim que o player existir (sem esperar a rede ficar ociosa)
+                        try:
+                            await new_page.wait_for_selector(PLAYER_SELECTOR, timeout=30000)
+                        except PlaywrightTimeoutError:
+                            print(f"   ⚠️ [{index}] Player não apareceu, analisando a página como está")
                         
                         # Procurar botão de download no record
                         print("\n   🔍 Analisando todos os elementos da página do record...")
                         
-                        # Análise completa da página
-                        page_analysis = new_page.evaluate("""
-                            () => {
-                                const result = {
-                                    videos: [],
-                                    iframes: [],
-                                    canvas: [],
-                                    links: [],
-                                    buttons: [],
-                                    images: [],
-                                    audios: [],
-                                    sources: [],
-                                    divs_with_video_class: [],
-                                    all_media: [],
-                                };
-                                
-                                // Vídeos
-                                document.querySelectorAll('video').forEach((el, i) => {
-                                    result.videos.push({
-                                        index: i,
-                                        src: el.src || el.currentSrc || '',
-                                        poster: el.poster || '',
-                                        sources: Array.from(el.querySelectorAll('source')).map(s => s.src),
-                                    });
-                                });
-                                
-                                // Iframes
-                                document.querySelectorAll('iframe').forEach((el, i) => {
-                                    result.iframes.push({
-                                        index: i,
-                                        src: el.src || '',
-                                    });
-                                });
-                                
-                                // Canvas (pode ser onde renderiza o playback)
-                                document.querySelectorAll('canvas').forEach((el, i) => {
-                                    result.canvas.push({
-                                        index: i,
-                                        width: el.width,
-                                        height: el.height,
-                                        id: el.id || '',
-                                        classes: typeof el.className === 'string' ? el.className : '',
-                                    });
-                                });
-                                
-                                // Links com download ou arquivos
-                                document.querySelectorAll('a').forEach((el, i) => {
-                                    const href = el.href || '';
-                                    const text = (el.textContent || '').trim();
-                                    if (href && (href.includes('download') || href.includes('.mp4') || 
-                                        href.includes('.zip') || href.includes('.pdf') || 
-                                        href.includes('blob:') || el.hasAttribute('download'))) {
-                                        result.links.push({
-                                            index: i,
-                                            href: href.substring(0, 100),
-                                            text: text.substring(0, 30),
-                                            hasDownload: el.hasAttribute('download'),
-                                        });
-                                    }
-                                });
-                                
-                                // Todos os botões
-                                document.querySelectorAll('button, [role="button"]').forEach((el, i) => {
-                                    const text = (el.textContent || '').trim();
-                                    const classes = typeof el.className === 'string' ? el.className : '';
-                                    if (text || classes.includes('download') || classes.includes('export') || classes.includes('save')) {
-                                        result.buttons.push({
-                                            index: i,
-                                            text: text.substring(0, 40),
-                                            classes: classes.substring(0, 60),
-                                            tag: el.tagName,
-                                        });
-                                    }
-                                });
-                                
-                                // Divs com classes relacionadas a vídeo/player
-                                document.querySelectorAll('[class*="video"], [class*="player"], [class*="playback"], [class*="media"]').forEach((el, i) => {
-                                    if (i < 10) {
-                                        result.divs_with_video_class.push({
-                                            index: i,
-                                            tag: el.tagName,
-                                            classes: typeof el.className === 'string' ? el.className.substring(0, 80) : '',
-                                            id: el.id || '',
-                                        });
-                                    }
-                                });
-                                
-                                // Sources de áudio/vídeo
-                                document.querySelectorAll('source').forEach((el, i) => {
-                                    result.sources.push({
-                                        index: i,
-                                        src: el.src || '',
-                                        type: el.type || '',
-                                    });
-                                });
-                                
-                                // Imagens grandes (podem ser frames/thumbnails)
-                                document.querySelectorAll('img').forEach((el, i) => {
-                                    if (el.naturalWidth > 200 || el.width > 200) {
-                                        result.images.push({
-                                            index: i,
-                                            src: (el.src || '').substring(0, 100),
-                                            width: el.width || el.naturalWidth,
-                                            height: el.height || el.naturalHeight,
-                                        });
-                                    }
-                                });
-                                
-                                return result;
-                            }
-                        """)
+                        # Screenshot do record (opcional) capturado em memória, em paralelo com a
+                        # análise completa da página; a gravação em disco vai para uma thread
+                        record_screenshot = records_path / f"record_{index}_screenshot.jpg"
+                        screenshot_task = (
+                            asyncio.create_task(new_page.screenshot(full_page=False, type="jpeg", quality=60))
+                            if DEBUG_DUMP else None
+                        )
+                        page_analysis = await new_page.evaluate("window.__analyze()")
                         
-                        print("\n   📊 ANÁLISE COMPLETA DA PÁGINA DO RECORD:")
-                        print(f"      🎬 Vídeos: {len(page_analysis.get('videos', []))}")
+                        if screenshot_task:
+                            await asyncio.to_thread(record_screenshot.write_bytes, await screenshot_task)
+                            print(f"   📸 Screenshot salvo: {record_screenshot}")
+                        
+                        # Relatório montado em memória e escrito de uma vez (também não se mistura
+                        # com a saída das outras abas em paralelo)
+                        report = ["\n   📊 ANÁLISE COMPLETA DA PÁGINA DO RECORD:"]
+                        report.append(f"      🎬 Vídeos: {len(page_analysis.get('videos', []))}")
                         for v in page_analysis.get('videos', []):
-                            print(f"         src: {v['src'][:80] if v['src'] else 'N/A'}")
+                            report.append(f"         src: {v['src'][:80] if v['src'] else 'N/A'}")
                             for s in v.get('sources', []):
-                                print(f"         source: {s[:80]}")
+                                report.append(f"         source: {s[:80]}")
                         
-                        print(f"      📺 Iframes: {len(page_analysis.get('iframes', []))}")
+                        report.append(f"      📺 Iframes: {len(page_analysis.get('iframes', []))}")
                         for i in page_analysis.get('iframes', []):
-                            print(f"         src: {i['src'][:80] if i['src'] else 'N/A'}")
+                            report.append(f"         src: {i['src'][:80] if i['src'] else 'N/A'}")
                         
-                        print(f"      🎨 Canvas: {len(page_analysis.get('canvas', []))}")
+                        report.append(f"      🎨 Canvas: {len(page_analysis.get('canvas', []))}")
                         for c in page_analysis.get('canvas', []):
-                            print(f"         {c['width']}x{c['height']} | id: {c['id']} | classes: {c['classes'][:40]}")
+                            report.append(f"         {c['width']}x{c['height']} | id: {c['id']} | classes: {c['classes'][:40]}")
                         
-                        print(f"      🔗 Links de download: {len(page_analysis.get('links', []))}")
+                        report.append(f"      🔗 Links de download: {len(page_analysis.get('links', []))}")
                         for l in page_analysis.get('links', []):
-                            print(f"         {l['href'][:60]} | download: {l['hasDownload']}")
+                            report.append(f"         {l['href'][:60]} | download: {l['hasDownload']}")
                         
-                        print(f"      🎮 Divs video/player: {len(page_analysis.get('divs_with_video_class', []))}")
+                        report.append(f"      🎮 Divs video/player: {len(page_analysis.get('divs_with_video_class', []))}")
                         for d in page_analysis.get('divs_with_video_class', [])[:5]:
-                            print(f"         {d['tag']} | {d['classes'][:50]}")
+                            report.append(f"         {d['tag']} | {d['classes'][:50]}")
                         
-                        print(f"      📦 Sources: {len(page_analysis.get('sources', []))}")
+                        report.append(f"      📦 Sources: {len(page_analysis.get('sources', []))}")
                         for s in page_analysis.get('sources', []):
-                            print(f"         {s['src'][:80]} | type: {s['type']}")
+                            report.append(f"         {s['src'][:80]} | type: {s['type']}")
                         
-                        print(f"      🖼️ Imagens grandes: {len(page_analysis.get('images', []))}")
+                        report.append(f"      🖼️ Imagens grandes: {len(page_analysis.get('images', []))}")
                         for img in page_analysis.get('images', [])[:3]:
-                            print(f"         {img['width']}x{img['height']} | {img['src'][:60]}")
+                            report.append(f"         {img['width']}x{img['height']} | {img['src'][:60]}")
                         
-                        print(f"      🔘 Botões: {len(page_analysis.get('buttons', []))}")
+                        report.append(f"      🔘 Botões: {len(page_analysis.get('buttons', []))}")
                         for b in page_analysis.get('buttons', [])[:10]:
-                            print(f"         [{b['index']}] {b['tag']}: '{b['text']}' | {b['classes'][:30]}")
-                        
-                        # Capturar network requests para encontrar URLs de mídia
-                        print("\n   🌐 Capturando requisições de rede...")
-                        media_urls = []
+                            report.append(f"         [{b['index']}] {b['tag']}: '{b['text']}' | {b['classes'][:30]}")
                         
-                        def capture_media(response):
-                            url = response.url
-                            content_type = response.headers.get('content-type', '')
-                            if any(ext in url.lower() for ext in ['.mp4', '.webm', '.m3u8', '.ts', '.flv', 'video', 'media', 'flight_datas', 'airline']):
-                                media_urls.append({'url': url, 'type': content_type})
-                            if 'video' in content_type or 'octet-stream' in content_type:
-                                media_urls.append({'url': url, 'type': content_type})
+                        sys.stdout.write("\n".join(report) + "\n")
                         
-                        new_page.on('response', capture_media)
+                        # URLs de mídia já capturadas desde a abertura da aba (sem reload)
+                        print("\n   🌐 Capturando requisições de rede...")
+                        media_urls = media_by_page.setdefault(new_page, {})
                         
-                        # Recarregar para capturar as requisições (timeout maior)
+                        # Os dados de voo chegam por XHR: espera limitada se nenhum chegou ainda
                         try:
-                            new_page.reload()
-                            new_page.wait_for_load_state("networkidle", timeout=60000)
-                        except Exception as reload_error:
-                            print(f"   ⚠️ Timeout no reload, continuando com dados capturados: {reload_error}")
+                            if not media_urls:
+                                response = await new_page.wait_for_event(
+                                    "response",
+                                    predicate=lambda r: is_media_response(r.url, r.headers.get('content-type', '')),
+                                    timeout=15000,
+                                )
+                                # Mesmo critério da captura: garante a entrada mesmo que o
+                                # listener do contexto ainda não tenha rodado
+                                media_urls.setdefault(response.url, response.headers.get('content-type', ''))
+                        except PlaywrightTimeoutError:
+                            print("   ⚠️ Timeout aguardando mídia, continuando com dados capturados")
                         
                         if media_urls:
                             print(f"   📡 URLs de mídia encontradas: {len(media_urls)}")
-                            for m in media_urls[:10]:
-                                print(f"      {m['url'][:80]} | {m['type']}")
+                            for url, content_type in list(media_urls.items())[:10]:
+                                print(f"      {url[:80]} | {content_type or '?'}")
                             
-                            # Baixar os arquivos de mídia
+                            # Baixar os arquivos de mídia, todos em paralelo
                             print("\n   📥 Baixando arquivos de mídia...")
-                            import requests
                             
-                            # Pegar cookies da sessão
-                            cookies = new_page.context.cookies()
-                            cookie_dict = {c['name']: c['value'] for c in cookies}
+                            # Atualizar cookies da sessão no cliente compartilhado
+                            for c in await context.cookies():
+                                http_client.cookies.set(c['name'], c['value'], domain=c['domain'], path=c['path'])
                             
-                            for idx, media in enumerate(media_urls):
-                                url = media['url']
-                                content_type = media['type']
-                                
-                                # Determinar extensão
-                                if 'airline' in url:
-                                    ext = '.bin'  # dados de rota
-                                    filename = f"record_0_route_{idx}{ext}"
-                                elif 'flight_records' in url:
-                                    ext = '.bin'  # dados de voo
-                                    filename = f"record_0_flight_data_{idx}{ext}"
-                                else:
-                                    ext = '.bin'
-                                    filename = f"record_0_media_{idx}{ext}"
-                                
-                                filepath = os.path.join(records_path, filename)
+                            async def fetch_media(idx, url):
+                                filename = media_filename(url, index, idx)
+                                filepath = records_path / filename
                                 
                                 try:
-                                    resp = requests.get(url, cookies=cookie_dict, timeout=60)
-                                    if resp.status_code == 200:
-                                        with open(filepath, 'wb') as f:
-                                            f.write(resp.content)
-                                        print(f"      ✅ Baixado: {filename} ({len(resp.content):,} bytes)")
-                                    else:
-                                        print(f"      ⚠️ Erro {resp.status_code}: {filename}")
+                                    # Em streaming: memória limitada ao chunk, não ao arquivo inteiro
+                                    async with http_client.stream("GET", url) as resp:
+                                        if resp.status_code == 200:
+                                            with open(filepath, 'wb') as f:
+                                                async for chunk in resp.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                                                    f.write(chunk)
+                                            print(f"      ✅ Baixado: {filename} ({filepath.stat().st_size:,} bytes)")
+                                        else:
+                                            print(f"      ⚠️ Erro {resp.status_code}: {filename}")
                                 except Exception as e:
                                     print(f"      ❌ Erro ao baixar {filename}: {e}")
+                            
+                            await asyncio.gather(*(fetch_media(idx, url) for idx, url in enumerate(list(media_urls))))
                         else:
                             print("   ⚠️ Nenhuma URL de mídia capturada")
                         
                         # Salvar análise em arquivo JSON
-                        import json
-                        analysis_file = os.path.join(records_path, "record_0_analysis.json")
-                        with open(analysis_file, 'w', encoding='utf-8') as f:
-                            page_analysis['media_urls'] = media_urls
-                            page_analysis['record_url'] = record_url
-                            json.dump(page_analysis, f, indent=2, ensure_ascii=False)
+                        analysis_file = records_path / f"record_{index}_analysis.json"
+                        page_analysis['media_urls'] = [{'url': url, 'type': content_type} for url, content_type in media_urls.items()]
+                        page_analysis['record_url'] = record_url
+                        # Relatório para leitura humana: sempre indentado
+                        write_json(analysis_file, page_analysis, orjson.OPT_INDENT_2)
                         print(f"\n   💾 Análise salva em: {analysis_file}")
                         
-                        # Fechar a aba apenas se for uma nova aba
-                        if is_new_tab:
-                            new_page.close()
-                            print("\n   🔄 Aba do record fechada")
-                        else:
-                            # Voltar para /records
-                            page.goto("https://www.djiag.com/records")
-                            page.wait_for_load_state("networkidle", timeout=30000)
-                            print("\n   🔄 Voltou para /records")
-                    else:
-                        print("   ⚠️ Nenhum botão Playback encontrado")
-                        
-        except Exception as e:
-            print(f"   ❌ Erro ao abrir record: {e}")
-        
-        print("\n   ✅ ETAPA 6 concluída!")
-    
-    elif "/login" not in final_url:
-        # Logado mas não está em /records (ex: /mission)
-        print("\n" + "=" * 60)
-        print(" ⚠️ LOGIN OK, MAS NÃO ESTÁ EM /RECORDS")
-        print(f"    URL: {final_url}")
-        print("=" * 60)
+                    except Exception as e:
+                        print(f"   ❌ [{index}] Erro ao processar record: {e}")
+                    finally:
+                        # Fechar a aba logo para limitar memória
+                        media_by_page.pop(new_page, None)
+                        await new_page.close()
+                        print(f"\n   🔄 [{index}] Aba do record fechada")
+            
+            # Um cliente HTTP para todos os records: conexões e TLS reaproveitados
+            async with httpx.AsyncClient(timeout=60, limits=httpx.Limits(max_connections=16)) as http_client:
+                await asyncio.gather(*(process_record(i, key) for i, key in enumerate(record_keys)))
+            
+            print("\n   ✅ ETAPA 6 concluída!")
         
-        screenshot_path = os.path.join(os.path.dirname(__file__), "debug_screenshot.png")
-        page.screenshot(path=screenshot_path)
-        print(f"   📸 Screenshot salvo em: {screenshot_path}")
+        elif "/login" not in final_url:
+            # Logado mas não está em /records (ex: /mission)
+            print("\n" + "=" * 60)
+            print(" ⚠️ LOGIN OK, MAS NÃO ESTÁ EM /RECORDS")
+            print(f"    URL: {final_url}")
+            print("=" * 60)
+            
+            screenshot_path = DEBUG_SCREENSHOT_PATH
+            await page.screenshot(path=screenshot_path)
+            print(f"   📸 Screenshot salvo em: {screenshot_path}")
+            
+        else:
+            print("\n" + "=" * 60)
+            print(" ❌ LOGIN FALHOU")
+            print(f"    URL: {final_url}")
+            print("=" * 60)
+            
+            # Salvar screenshot para debug
+            screenshot_path = DEBUG_SCREENSHOT_PATH
+            await page.screenshot(path=screenshot_path)
+            print(f"   📸 Screenshot salvo em: {screenshot_path}")
         
-    else:
-        print("\n" + "=" * 60)
-        print(" ❌ LOGIN FALHOU")
-        print(f"    URL: {final_url}")
-        print("=" * 60)
+        # Manter browser aberto por alguns segundos (só em depuração)
+        if DEBUG_KEEP_BROWSER:
+            print("\n🔄 Fechando browser em 5 segundos...")
+            await asyncio.sleep(5)
         
-        # Salvar screenshot para debug
-        screenshot_path = os.path.join(os.path.dirname(__file__), "debug_screenshot.png")
-        page.screenshot(path=screenshot_path)
-        print(f"   📸 Screenshot salvo em: {screenshot_path}")
-    
-    # Manter browser aberto por alguns segundos
-    print("\n🔄 Fechando browser em 5 segundos...")
-    time.sleep(5)
-    
-    context.close()
+        await context.close()
+        await browser.close()
+
+
+asyncio.run(main())
 
 print("\n✅ Script finalizado!")
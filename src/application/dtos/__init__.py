@@ -26,6 +26,7 @@ class RecordListResponse:
     total: int
     page: int
     per_page: int
+    next_cursor: Optional[str] = None
 
 
 @dataclass
@@ -1,9 +1,12 @@
 """
 Use Case: Get Flight Data
 """
+import asyncio
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Optional
 from ..dtos import FlightDataDTO, GpsPointDTO
+from ...domain.entities import FlightData
 from ...domain.interfaces import IRecordRepository
 
 
@@ -12,26 +15,85 @@ class GetFlightDataInput:
     record_id: str
     include_points: bool = True
     format: str = "json"  # json, geojson
+    page: Optional[int] = None  # None = todos os pontos
+    per_page: int = 1000
 
 
 class GetFlightDataUseCase:
     """Caso de uso para buscar dados de voo"""
     
-    def __init__(self, record_repository: IRecordRepository):
+    def __init__(self, record_repository: IRecordRepository, cache_size: int = 8):
         self._repository = record_repository
+        # Ultimos voos carregados (ou em carregamento) por record_id.
+        # json, /geojson e /geojson/download compartilham a mesma busca.
+        self._cache_size = cache_size
+        self._flight_data: "OrderedDict[str, asyncio.Future]" = OrderedDict()
+    
+    async def _load_flight_data(self, record_id: str) -> Optional[FlightData]:
+        """Busca o voo no repositorio uma unica vez, mesmo com requests simultaneos"""
+        future = self._flight_data.get(record_id)
+        if future is None:
+            future = asyncio.ensure_future(self._repository.get_flight_data(record_id))
+            future.add_done_callback(lambda done: self._forget_unless_found(record_id, done))
+            self._flight_data[record_id] = future
+            while len(self._flight_data) > self._cache_size:
+                self._flight_data.popitem(last=False)
+        else:
+            self._flight_data.move_to_end(record_id)
+        
+        # shield: cancelar um request nao cancela a busca compartilhada
+        return await asyncio.shield(future)
+    
+    def has_flight_data(self, record_id: str) -> bool:
+        """True se o voo do record ja foi carregado com sucesso (nao dispara busca)"""
+        future = self._flight_data.get(record_id)
+        return (
+            future is not None
+            and future.done()
+            and not future.cancelled()
+            and future.exception() is None
+            and future.result() is not None
+        )
+    
+    def _forget_unless_found(self, record_id: str, future: asyncio.Future):
+        """
+        Ao fim da busca, remove do cache falhas, cancelamentos e "nao encontrado"
+        (pode aparecer em uma nova tentativa). Roda mesmo sem nenhum request
+        aguardando, entao uma falha nunca fica guardada.
+        """
+        if not future.cancelled() and future.exception() is None and future.result() is not None:
+            return
+        if self._flight_data.get(record_id) is future:
+            del self._flight_data[record_id]
     
     async def execute(self, input_data: GetFlightDataInput) -> Optional[FlightDataDTO]:
-        flight_data = await self._repository.get_flight_data(input_data.record_id)
+        record = None
+        if input_data.format == "geojson":
+            # Metadados do record e dados de voo sao buscados em paralelo
+            flight_data, record = await asyncio.gather(
+                self._load_flight_data(input_data.record_id),
+                self._repository.get_by_id(input_data.record_id),
+            )
+        else:
+            flight_data = await self._load_flight_data(input_data.record_id)
         
         if not flight_data:
             return None
         
-        # Calcular bounds e telemetry
-        flight_data.calculate_bounds()
-        flight_data.calculate_telemetry()
+        # Bounds e telemetry ja vem calculados na decodificacao;
+        # so recalcula se o repositorio entregou sem eles
+        if flight_data.bounds is None:
+            flight_data.calculate_bounds()
+        if flight_data.telemetry is None:
+            flight_data.calculate_telemetry()
         
         points = None
         if input_data.include_points:
+            selected = flight_data.points
+            if input_data.page is not None:
+                offset = (input_data.page - 1) * input_data.per_page
+                selected = selected[offset:offset + input_data.per_page]
+            
             points = [
                 GpsPointDTO(
                     index=p.index,
@@ -43,13 +105,12 @@ class GetFlightDataUseCase:
                     spray_rate=p.spray_rate,
                     speed_ms=p.speed_ms,
                 )
-                for p in flight_data.points
+                for p in selected
             ]
         
         # Se formato é GeoJSON, retornar diretamente
         geojson = None
         if input_data.format == "geojson":
-            record = await self._repository.get_by_id(input_data.record_id)
             geojson = flight_data.to_geojson(record)
         
         return FlightDataDTO(
@@ -2,7 +2,7 @@
 Use Case: List Records
 """
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 from ..dtos import RecordListResponse, RecordSummaryDTO
 from ...domain.interfaces import IRecordRepository
 
@@ -11,6 +11,7 @@ from ...domain.interfaces import IRecordRepository
 class ListRecordsInput:
     page: int = 1
     per_page: int = 30
+    after: Optional[str] = None  # cursor: id do ultimo record da pagina anterior
 
 
 class ListRecordsUseCase:
@@ -25,9 +26,15 @@ class ListRecordsUseCase:
         
         records = await self._repository.list_all(
             page=input_data.page,
-            per_page=input_data.per_page
+            per_page=input_data.per_page,
+            after=input_data.after,
+            lookahead=1,
         )
         
+        # Um record alem da pagina indica que ha proxima: sem ele, next_cursor e null
+        has_more = len(records) > input_data.per_page
+        records = records[:input_data.per_page]
+        
         items = [
             RecordSummaryDTO(
                 id=r.id,
@@ -48,4 +55,5 @@ class ListRecordsUseCase:
             total=len(items),
             page=input_data.page,
             per_page=input_data.per_page,
+            next_cursor=items[-1].id if has_more else None,
         )
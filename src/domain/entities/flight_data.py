@@ -115,12 +115,15 @@ class FlightData:
     
     def to_geojson(self, record: 'Record' = None) -> dict:
         """Converte para GeoJSON"""
+        # Coordenadas montadas uma unica vez e compartilhadas entre a rota e os pontos
+        coordinates = [[p.longitude, p.latitude] for p in self.points]
+        
         # LineString da rota
         route_feature = {
             "type": "Feature",
             "geometry": {
                 "type": "LineString",
-                "coordinates": [[p.longitude, p.latitude] for p in self.points]
+                "coordinates": coordinates
             },
             "properties": {
                 "type": "flight_path",
@@ -134,11 +137,11 @@ class FlightData:
                 "type": "Feature",
                 "geometry": {
                     "type": "Point",
-                    "coordinates": [p.longitude, p.latitude]
+                    "coordinates": coords
                 },
                 "properties": p.to_dict()
             }
-            for p in self.points
+            for p, coords in zip(self.points, coordinates)
         ]
         
         # Properties do FeatureCollection
@@ -6,7 +6,7 @@ from datetime import datetime
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class RecordSummary:
     """Resumo de um record (lista)"""
     id: str
@@ -18,6 +18,21 @@ class RecordSummary:
     flight_mode: str
     pilot_name: str
     device_name: str
+    
+    @classmethod
+    def from_row(cls, row: dict) -> "RecordSummary":
+        """Cria a partir de uma linha da tabela (sem expansao de kwargs)"""
+        return cls(
+            row['id'],
+            row['takeoff_landing_time'],
+            row['flight_duration'],
+            row['task_mode'],
+            row['area'],
+            row['application_rate'],
+            row['flight_mode'],
+            row['pilot_name'],
+            row['device_name'],
+        )
 
 
 @dataclass
@@ -10,8 +10,17 @@ class IRecordRepository(ABC):
     """Interface para repositório de Records"""
     
     @abstractmethod
-    async def list_all(self, page: int = 1, per_page: int = 30) -> List[RecordSummary]:
-        """Lista todos os records com paginação"""
+    async def list_all(
+        self,
+        page: int = 1,
+        per_page: int = 30,
+        after: Optional[str] = None,
+        lookahead: int = 0,
+    ) -> List[RecordSummary]:
+        """
+        Lista todos os records com paginação (offset ou cursor after).
+        Com lookahead, inclui até lookahead records além da página (para saber se há próxima).
+        """
         pass
     
     @abstractmethod
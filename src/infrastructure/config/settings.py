@@ -25,6 +25,11 @@ class Settings:
     # Browser settings
     browser_headless: bool = os.getenv("BROWSER_HEADLESS", "false").lower() == "true"
     browser_profile_dir: str = os.getenv("BROWSER_PROFILE_DIR", str(BASE_DIR / "browser_profile"))
+    browser_pool_size: int = int(os.getenv("BROWSER_POOL_SIZE", "1"))
+    browser_page_pool_size: int = int(os.getenv("BROWSER_PAGE_POOL_SIZE", "1"))
+    browser_slow_mo: int = int(os.getenv("BROWSER_SLOW_MO", "0"))  # ms entre acoes (debug)
+    playwright_inspect_stack: bool = os.getenv("PW_INSPECT_STACK", "0") == "1"  # stack por chamada (debug)
+    browser_block_assets: bool = os.getenv("BROWSER_BLOCK_ASSETS", "false").lower() == "true"
     
     # API settings
     api_host: str = os.getenv("API_HOST", "0.0.0.0")
@@ -35,6 +40,11 @@ class Settings:
     # Downloads
     downloads_dir: str = os.getenv("DOWNLOADS_DIR", str(BASE_DIR / "downloads"))
     
+    # Cache de respostas (em memoria, por processo)
+    cache_ttl: int = int(os.getenv("CACHE_TTL", "3600"))  # s, flight data / GeoJSON
+    cache_list_ttl: int = int(os.getenv("CACHE_LIST_TTL", "60"))  # s, listagem de records
+    cache_max_entries: int = int(os.getenv("CACHE_MAX_ENTRIES", "64"))
+    
     # Coordinate filters (Brazil)
     lat_min: float = float(os.getenv("LAT_MIN", "-35"))
     lat_max: float = float(os.getenv("LAT_MAX", "-5"))
@@ -5,8 +5,12 @@ Usa a thread dedicada do Playwright para todas as operações de browser.
 """
 import asyncio
 import json
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
-from typing import List, Optional, TYPE_CHECKING
+from typing import List, Optional, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from playwright.sync_api import Page
@@ -16,17 +20,44 @@ from ...domain.entities import Record, RecordSummary, FlightData
 from ..services import PlaywrightBrowserService, ProtobufDecoder
 from ..config import get_settings
 
+logger = logging.getLogger(__name__)
+
+# Pool para decodificar protobuf fora da thread do Playwright,
+# permitindo que o browser siga para o proximo record durante o decode
+_decode_pool = ThreadPoolExecutor(
+    max_workers=os.cpu_count(),
+    thread_name_prefix="flight-decode",
+)
+
 
 class DjiAgRecordRepository(IRecordRepository):
     """Repositório para records do DJI AG usando Playwright"""
     
+    # URLs de interesse: metadados do record (exceto /aggr) e payload binario de voo
+    _RECORD_URL_RE = re.compile(r'/flight_records/(?P<record>\w+)(?P<aggr>/aggr)?')
+    _BINARY_URL_RE = re.compile(r'flight_datas|objects/airline')
+    
     def __init__(self, browser_service: PlaywrightBrowserService):
         self._browser = browser_service
         self._decoder = ProtobufDecoder()
         self._settings = get_settings()
     
-    def _list_all_in_browser(self, page: "Page", context, req_page: int = 1, per_page: int = 30) -> List[RecordSummary]:
-        """Lista todos os records (executado na thread do Playwright)"""
+    def _list_all_in_browser(
+        self,
+        page: "Page",
+        context,
+        req_page: int = 1,
+        per_page: int = 30,
+        after: Optional[str] = None,
+        lookahead: int = 0,
+    ) -> List[RecordSummary]:
+        """
+        Lista os records da pagina pedida (executado na thread do Playwright).
+        
+        Com after (cursor), retorna os per_page records seguintes ao record
+        after na ordem da tabela. A paginacao da tabela so avanca ate reunir
+        os records necessarios (mais lookahead records alem da pagina).
+        """
         # Navegar para records
         page.goto("https://www.djiag.com/br/records", timeout=60000)
         page.wait_for_load_state("networkidle")
@@ -47,6 +78,11 @@ class DjiAgRecordRepository(IRecordRepository):
         all_records = []
         current_page = 1
         
+        # Com cursor, so entram os records depois do after
+        collecting = after is None
+        start = 0 if after else (req_page - 1) * per_page
+        needed = start + per_page + lookahead
+        
         while True:
             # Extrair dados da tabela
             table_data = page.evaluate("""
@@ -61,16 +97,18 @@ class DjiAgRecordRepository(IRecordRepository):
                         if (!rowKey || rowKey.length > 12) return;
                         
                         if (cells.length >= 9) {
+                            // Le o texto de cada celula uma unica vez
+                            const t = Array.from(cells, c => (c.textContent || '').trim());
                             records.push({
                                 id: rowKey,
-                                takeoff_landing_time: cells[1]?.textContent?.trim() || '',
-                                flight_duration: cells[2]?.textContent?.trim() || '',
-                                task_mode: cells[3]?.textContent?.trim() || '',
-                                area: cells[4]?.textContent?.trim() || '',
-                                application_rate: cells[5]?.textContent?.trim() || '',
-                                flight_mode: cells[6]?.textContent?.trim() || '',
-                                pilot_name: cells[7]?.textContent?.trim() || '',
-                                device_name: cells[8]?.textContent?.trim() || '',
+                                takeoff_landing_time: t[1],
+                                flight_duration: t[2],
+                                task_mode: t[3],
+                                area: t[4],
+                                application_rate: t[5],
+                                flight_mode: t[6],
+                                pilot_name: t[7],
+                                device_name: t[8],
                             });
                         }
                     });
@@ -79,8 +117,19 @@ class DjiAgRecordRepository(IRecordRepository):
                 }
             """)
             
-            for r in table_data:
-                all_records.append(RecordSummary(**r))
+            rows = [RecordSummary.from_row(r) for r in table_data]
+            if collecting:
+                all_records.extend(rows)
+            else:
+                for i, row in enumerate(rows):
+                    if row.id == after:
+                        collecting = True
+                        all_records.extend(rows[i + 1:])
+                        break
+            
+            # Ja ha records suficientes: nao percorre o resto da tabela
+            if len(all_records) >= needed:
+                break
             
             # Verificar próxima página
             has_next = page.evaluate("""
@@ -106,45 +155,95 @@ class DjiAgRecordRepository(IRecordRepository):
                 break
         
         # Aplicar paginação do request
-        start = (req_page - 1) * per_page
-        end = start + per_page
-        
-        return all_records[start:end]
+        return all_records[start:needed]
     
-    async def list_all(self, page: int = 1, per_page: int = 30) -> List[RecordSummary]:
-        """Lista todos os records com paginacao"""
+    async def list_all(
+        self,
+        page: int = 1,
+        per_page: int = 30,
+        after: Optional[str] = None,
+        lookahead: int = 0,
+    ) -> List[RecordSummary]:
+        """Lista todos os records com paginacao (offset ou cursor after)"""
         return await self._browser.execute_in_browser(
             self._list_all_in_browser,
             req_page=page,
-            per_page=per_page
+            per_page=per_page,
+            after=after,
+            lookahead=lookahead,
         )
     
-    def _get_by_id_in_browser(self, page: "Page", context, record_id: str) -> Optional[Record]:
-        """Busca um record pelo ID (executado na thread do Playwright)"""
+    def _capture_and_navigate(
+        self,
+        page: "Page",
+        record_id: str,
+        want_metadata: bool = True,
+        want_bytes: bool = False,
+    ) -> Tuple[dict, List[bytes]]:
+        """
+        Navega para o record capturando as respostas da API
+        (executado na thread do Playwright).
+        
+        Retorna (metadata, lista de payloads binarios).
+        """
         api_metadata = {}
+        binary_responses = []
         
-        # Capturar resposta da API
+        # Capturar respostas
+        # Os bodies binarios nao sao lidos aqui: response.body() bloqueia o
+        # dispatch de eventos ate o payload inteiro ser transferido. As
+        # respostas sao guardadas e lidas depois que a navegacao termina.
         def capture_response(response):
             nonlocal api_metadata
             try:
-                url = response.url
                 content_type = response.headers.get('content-type', '')
                 
-                if 'json' in content_type:
-                    if f'/flight_records/{record_id}' in url and '/aggr' not in url:
+                if want_metadata and 'json' in content_type:
+                    match = self._RECORD_URL_RE.search(response.url)
+                    if match and match.group('record') == record_id and not match.group('aggr'):
                         data = response.json()
                         if data.get('data'):
                             api_metadata = data['data']
-            except:
-                pass
+                
+                elif want_bytes and 'octet-stream' in content_type:
+                    if self._BINARY_URL_RE.search(response.url):
+                        binary_responses.append(response)
+            except Exception as e:
+                logger.warning(f"[Capture] Erro capturando resposta: {e}")
         
         page.on("response", capture_response)
+        try:
+            page.goto(f"https://www.djiag.com/record/{record_id}", timeout=60000)
+            # Dados binarios demoram mais para carregar que os metadados
+            page.wait_for_timeout(8000 if want_bytes else 5000)
+            page.wait_for_load_state("networkidle")
+        finally:
+            # A pagina volta ao pool: o listener nao pode sobreviver a uma falha
+            page.remove_listener("response", capture_response)
         
-        page.goto(f"https://www.djiag.com/record/{record_id}", timeout=60000)
-        page.wait_for_timeout(5000)
-        page.wait_for_load_state("networkidle")
+        flight_data_bytes = []
+        for response in binary_responses:
+            try:
+                # Evita baixar o body de payloads pequenos quando o tamanho e conhecido.
+                # Com content-encoding (gzip/br) o content-length e do corpo comprimido,
+                # nao do protobuf: nesse caso so o tamanho decodificado decide.
+                headers = response.headers
+                content_length = headers.get('content-length')
+                if content_length and not headers.get('content-encoding') and int(content_length) <= 10000:
+                    continue
+                
+                body = response.body()
+                logger.info(f"[FlightData] Dados binários capturados: {len(body)} bytes")
+                if len(body) > 10000:
+                    flight_data_bytes.append(body)
+            except Exception as e:
+                logger.warning(f"[Capture] Erro lendo body: {e}")
         
-        page.remove_listener("response", capture_response)
+        return api_metadata, flight_data_bytes
+    
+    def _get_by_id_in_browser(self, page: "Page", context, record_id: str) -> Optional[Record]:
+        """Busca um record pelo ID (executado na thread do Playwright)"""
+        api_metadata, _ = self._capture_and_navigate(page, record_id)
         
         if not api_metadata:
             return None
@@ -182,42 +281,17 @@ class DjiAgRecordRepository(IRecordRepository):
             record_id=record_id
         )
     
-    def _get_flight_data_in_browser(self, page: "Page", context, record_id: str) -> Optional[FlightData]:
-        """Busca os dados de voo (executado na thread do Playwright)"""
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"[FlightData] Iniciando busca para record {record_id}")
-        
-        flight_data_bytes = []
-        
-        # Capturar dados binários
-        def capture_response(response):
-            try:
-                url = response.url
-                content_type = response.headers.get('content-type', '')
-                
-                if 'octet-stream' in content_type:
-                    logger.info(f"[FlightData] Resposta octet-stream: {url[:100]}")
-                    if 'flight_datas' in url or 'objects/airline' in url:
-                        body = response.body()
-                        logger.info(f"[FlightData] Dados binários capturados: {len(body)} bytes")
-                        if len(body) > 10000:
-                            flight_data_bytes.append(body)
-            except Exception as e:
-                logger.warning(f"[FlightData] Erro capturando resposta: {e}")
-        
-        page.on("response", capture_response)
-        
-        logger.info(f"[FlightData] Navegando para record {record_id}")
-        page.goto(f"https://www.djiag.com/record/{record_id}", timeout=60000)
+    def _get_flight_data_in_browser(self, page: "Page", context, record_id: str) -> Optional[bytes]:
+        """
+        Captura o payload binario de voo (executado na thread do Playwright).
         
-        logger.info("[FlightData] Aguardando 8s...")
-        page.wait_for_timeout(8000)
-        
-        logger.info("[FlightData] Aguardando networkidle...")
-        page.wait_for_load_state("networkidle")
+        Retorna os bytes brutos; o decode roda fora da thread do Playwright.
+        """
+        logger.info(f"[FlightData] Iniciando busca para record {record_id}")
         
-        page.remove_listener("response", capture_response)
+        _, flight_data_bytes = self._capture_and_navigate(
+            page, record_id, want_metadata=False, want_bytes=True
+        )
         
         logger.info(f"[FlightData] Dados capturados: {len(flight_data_bytes)} arquivos")
         
@@ -228,51 +302,49 @@ class DjiAgRecordRepository(IRecordRepository):
         # Usar o maior arquivo (mais dados)
         largest = max(flight_data_bytes, key=len)
         logger.info(f"[FlightData] Maior arquivo: {len(largest)} bytes")
-        
-        result = self._decoder.decode(largest, record_id)
-        logger.info(f"[FlightData] Decode retornou: {result is not None}")
-        return result
+        return largest
+    
+    async def _decode(self, binary_data: bytes, record_id: str) -> FlightData:
+        """Decodifica o protobuf no pool de decode, liberando a thread do Playwright"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _decode_pool,
+            self._decoder.decode,
+            binary_data,
+            record_id
+        )
     
     async def get_flight_data(self, record_id: str) -> Optional[FlightData]:
         """Busca os dados de voo de um record"""
-        return await self._browser.execute_in_browser(
+        largest = await self._browser.execute_in_browser(
             self._get_flight_data_in_browser,
             record_id=record_id
         )
-    
-    def _download_record_in_browser(self, page: "Page", context, record_id: str) -> Optional[dict]:
-        """Faz download completo de um record (executado na thread do Playwright)"""
-        api_metadata = {}
-        flight_data_bytes = []
-        
-        # Capturar respostas
-        def capture_response(response):
-            nonlocal api_metadata
-            try:
-                url = response.url
-                content_type = response.headers.get('content-type', '')
-                
-                if 'json' in content_type:
-                    if f'/flight_records/{record_id}' in url and '/aggr' not in url:
-                        data = response.json()
-                        if data.get('data'):
-                            api_metadata = data['data']
-                
-                if 'octet-stream' in content_type:
-                    if 'flight_datas' in url or 'objects/airline' in url:
-                        body = response.body()
-                        if len(body) > 10000:
-                            flight_data_bytes.append(body)
-            except:
-                pass
-        
-        page.on("response", capture_response)
+        if largest is None:
+            return None
         
-        page.goto(f"https://www.djiag.com/record/{record_id}", timeout=60000)
-        page.wait_for_timeout(8000)
-        page.wait_for_load_state("networkidle")
+        result = await self._decode(largest, record_id)
+        logger.info(f"[FlightData] Decode retornou: {result is not None}")
+        return result
+    
+    def _download_record_in_browser(self, page: "Page", context, record_id: str) -> Tuple[dict, Optional[bytes]]:
+        """
+        Captura metadados e payload binario de um record
+        (executado na thread do Playwright).
+        """
+        api_metadata, flight_data_bytes = self._capture_and_navigate(
+            page, record_id, want_metadata=True, want_bytes=True
+        )
         
-        page.remove_listener("response", capture_response)
+        largest = max(flight_data_bytes, key=len) if flight_data_bytes else None
+        return api_metadata, largest
+    
+    async def download_record(self, record_id: str) -> Optional[dict]:
+        """Faz download completo de um record"""
+        api_metadata, largest = await self._browser.execute_in_browser(
+            self._download_record_in_browser,
+            record_id=record_id
+        )
         
         if not api_metadata:
             return {"success": False, "message": "No metadata found"}
@@ -285,18 +357,10 @@ class DjiAgRecordRepository(IRecordRepository):
             "total_points": 0,
         }
         
-        if flight_data_bytes:
-            largest = max(flight_data_bytes, key=len)
-            flight_data = self._decoder.decode(largest, record_id)
+        if largest:
+            flight_data = await self._decode(largest, record_id)
             if flight_data:
                 result["flight_data"] = flight_data
                 result["total_points"] = flight_data.total_points
         
         return result
-    
-    async def download_record(self, record_id: str) -> Optional[dict]:
-        """Faz download completo de um record"""
-        return await self._browser.execute_in_browser(
-            self._download_record_in_browser,
-            record_id=record_id
-        )
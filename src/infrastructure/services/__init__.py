@@ -1,4 +1,5 @@
 from .browser_service import PlaywrightBrowserService
 from .protobuf_decoder import ProtobufDecoder
+from .response_cache import ResponseCache
 
-__all__ = ['PlaywrightBrowserService', 'ProtobufDecoder']
+__all__ = ['PlaywrightBrowserService', 'ProtobufDecoder', 'ResponseCache']
@@ -5,19 +5,87 @@ NOTA: Usa API sincrona do Playwright executada em uma unica thread dedicada
 para garantir compatibilidade e evitar problemas de threading.
 Todas as operacoes do Playwright DEVEM rodar na mesma thread
 onde o browser foi inicializado. Esta classe garante isso.
+
+A API async do Playwright nao e usada de proposito: ela depende do event
+loop do servidor (ProactorEventLoop no Windows, incompativel com o reload
+do uvicorn). Os metodos async do BrowserService aguardam o Future da
+thread dedicada diretamente (asyncio.wrap_future), sem threads de executor
+intermediarias.
 """
 import asyncio
+import inspect
+import os
 import threading
 import queue
 import time
-from functools import partial
-from typing import Optional, Any, Callable
-from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page
+import types
+from concurrent.futures import Future
+from typing import Optional, Any, Callable, Dict, List, Tuple
+from playwright.sync_api import sync_playwright, Browser, BrowserContext, Locator, Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
 from ...domain.interfaces import IBrowserService
 from ..config import get_settings
 
 
+# Intervalo (s) em que o browser e considerado saudavel sem nova verificacao
+HEALTH_CHECK_INTERVAL = 30
+
+# Tempo maximo (ms) aguardando o redirect pos-login (CAPTCHA manual incluso)
+CAPTCHA_TIMEOUT_MS = 60000
+
+# Validade (s) da ultima URL conhecida da pagina de sessao
+LAST_URL_TTL = 5
+
+# Recursos que o scraper nunca le (bloqueados com BROWSER_BLOCK_ASSETS).
+# Stylesheets ficam de fora: os seletores do login dependem de visibilidade.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+def _disable_playwright_stack_capture():
+    """
+    Desliga o inspect.stack() que o Playwright executa a cada chamada da API
+    (usado so para metadados de debug/tracing). Substitui apenas a referencia
+    ao modulo inspect dentro de playwright._impl._connection; o inspect
+    global continua intacto. Idempotente e tolerante a mudancas internas.
+    """
+    try:
+        from playwright._impl import _connection
+    except ImportError:
+        return
+    
+    current = getattr(_connection, "inspect", None)
+    if current is not inspect:
+        return  # Ja aplicado ou estrutura interna diferente
+    
+    _connection.inspect = types.SimpleNamespace(
+        **{name: getattr(inspect, name) for name in dir(inspect) if not name.startswith("__")},
+    )
+    _connection.inspect.stack = lambda *args, **kwargs: []
+
+
+def _block_assets(route):
+    """Aborta requests de recursos estaticos que nao sao lidos pelo scraper"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+
+# Seletores do login, agrupados do mais especifico ao mais generico.
+# Cada grupo e uma uniao CSS: o browser resolve todos de uma vez.
+DJI_LOGIN_BUTTON_SELECTORS = (
+    "button:has-text('Log in with DJI'), button:has-text('Login with DJI'), "
+    "a:has-text('Log in with DJI'), a:has-text('Login with DJI')",
+    "[class*='login']",
+    "button:has-text('Log in'), button:has-text('Login')",
+)
+
+ACCOUNT_SUBMIT_SELECTORS = (
+    "button[type='submit']",
+    "button:has-text('Log in'), button:has-text('Login'), button:has-text('Sign in')",
+)
+
+
 class PlaywrightThread:
     """
     Thread dedicada para todas as operacoes do Playwright.
@@ -25,88 +93,140 @@ class PlaywrightThread:
     onde o browser foi inicializado. Esta classe garante isso.
     """
     
-    def __init__(self):
-        self._task_queue = queue.Queue()
+    def __init__(self, profile_dir: Optional[str] = None):
+        self._task_queue = queue.SimpleQueue()
         self._thread: Optional[threading.Thread] = None
-        self._running = False
+        self._running = threading.Event()
         self._playwright = None
         self._context: Optional[BrowserContext] = None
         self._page: Optional[Page] = None
+        self._idle_pages: List[Page] = []
+        self._login_locators: Dict[str, Locator] = {}
+        self._healthy = False
+        self._last_health_check = 0.0
+        self._last_url: Optional[str] = None
+        self._last_url_ts = 0.0
+        # Estado da sessao deste worker: None ate a primeira verificacao/login
+        self._logged_in: Optional[bool] = None
         self._settings = get_settings()
+        self._profile_dir = profile_dir or self._settings.browser_profile_dir
         self._lock = threading.Lock()
     
+    @property
+    def logged_in(self) -> Optional[bool]:
+        """Ultimo estado de login conhecido (None = ainda nao verificado)"""
+        return self._logged_in
+    
+    def _run_task(self, task: Tuple[Callable, tuple, dict, Future]):
+        """Executa uma tarefa e resolve o seu Future"""
+        func, args, kwargs, future = task
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception as e:
+            # Forca nova verificacao do browser na proxima operacao
+            self._healthy = False
+            future.set_exception(e)
+    
     def _worker(self):
         """Worker que processa tarefas na thread dedicada"""
-        while self._running:
-            try:
-                task = self._task_queue.get(timeout=1)
-                if task is None:
-                    break
-                    
-                func, args, kwargs, result_queue = task
+        get_nowait = self._task_queue.get_nowait
+        while True:
+            # Bloqueia ate chegar uma tarefa; o shutdown e sinalizado pelo sentinel None
+            task = self._task_queue.get()
+            
+            # Drena o que ja estiver enfileirado antes de voltar a bloquear
+            while task is not None:
+                self._run_task(task)
                 try:
-                    result = func(*args, **kwargs)
-                    result_queue.put(('success', result))
-                except Exception as e:
-                    result_queue.put(('error', e))
-            except queue.Empty:
-                continue
+                    task = get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                # Saiu pelo sentinel (nao pela fila vazia): encerra o worker
+                break
     
     def start(self):
         """Inicia a thread do worker"""
+        if self._running.is_set():
+            return
         with self._lock:
-            if not self._running:
-                self._running = True
-                self._thread = threading.Thread(target=self._worker, daemon=True)
+            if not self._running.is_set():
+                self._thread = threading.Thread(
+                    target=self._worker,
+                    name=f"playwright-{os.path.basename(self._profile_dir)}",
+                    daemon=True,
+                )
                 self._thread.start()
+                self._running.set()
     
     def stop(self):
         """Para a thread do worker"""
         with self._lock:
-            self._running = False
             if self._thread:
                 self._task_queue.put(None)
                 self._thread.join(timeout=5)
                 self._thread = None
+            self._running.clear()
     
-    def execute(self, func: Callable, *args, **kwargs) -> Any:
-        """Executa uma funcao na thread dedicada e retorna o resultado"""
-        if not self._running:
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        """Enfileira uma funcao na thread dedicada e retorna um Future"""
+        if not self._running.is_set():
             self.start()
         
-        result_queue = queue.Queue()
-        self._task_queue.put((func, args, kwargs, result_queue))
-        
-        status, result = result_queue.get()
-        if status == 'error':
-            raise result
-        return result
+        future = Future()
+        self._task_queue.put((func, args, kwargs, future))
+        return future
+    
+    def execute(self, func: Callable, *args, **kwargs) -> Any:
+        """Executa uma funcao na thread dedicada e retorna o resultado"""
+        return self.submit(func, *args, **kwargs).result()
+    
+    async def execute_async(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Executa uma funcao na thread dedicada sem bloquear o event loop.
+        O resultado e entregue direto ao loop (call_soon_threadsafe),
+        sem ocupar uma thread do executor padrao esperando o Future.
+        """
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
     
     def _do_initialize(self):
         """Inicializa o Playwright na thread dedicada"""
+        # Fast path: browser verificado recentemente e sem falhas desde entao
+        now = time.monotonic()
+        if self._healthy and now - self._last_health_check < HEALTH_CHECK_INTERVAL:
+            return
+        
         # Verifica se precisa reinicializar
         needs_init = False
+        browser_dead = False
         
         if self._playwright is None:
             needs_init = True
-        elif self._context is None:
+        elif self._context is None or self._page is None or self._page.is_closed():
             needs_init = True
         else:
             # Verifica se o browser ainda esta ativo
+            # (contexto persistente nao expoe browser; nesse caso vale o evento "close")
             try:
                 browser = self._context.browser
-                if browser is None or not browser.is_connected():
-                    needs_init = True
+                if browser is not None and not browser.is_connected():
+                    needs_init = browser_dead = True
             except Exception:
-                needs_init = True
+                needs_init = browser_dead = True
         
         if not needs_init:
+            self._healthy = True
+            self._last_health_check = now
             return
         
         # Limpa recursos antigos se existirem
-        self._cleanup_resources()
+        self._cleanup_resources(graceful=not browser_dead)
         
         # Inicializa o Playwright
+        if not self._settings.playwright_inspect_stack:
+            _disable_playwright_stack_capture()
         self._playwright = sync_playwright().start()
         
         # Args para Docker/Linux (obrigatorios em container)
@@ -117,18 +237,27 @@ class PlaywrightThread:
             '--disable-gpu',                   # Sem GPU no container
             '--disable-setuid-sandbox',        # Seguranca container
             '--disable-software-rasterizer',   # Performance
+            '--disable-background-networking', # Sem trafego de background do Chrome
+            '--disable-features=TranslateUI',  # Sem barra de traducao
+            '--no-first-run',                  # Pula setup de primeira execucao
         ]
         
         # Lanca o browser com contexto persistente (mesma config do test_hybrid_login.py)
         self._context = self._playwright.chromium.launch_persistent_context(
-            user_data_dir=self._settings.browser_profile_dir,
+            user_data_dir=self._profile_dir,
             headless=self._settings.browser_headless,
-            slow_mo=100,
+            slow_mo=self._settings.browser_slow_mo,
             args=browser_args,
             ignore_default_args=['--enable-automation'],
             viewport={'width': 1280, 'height': 800}
         )
         
+        if self._settings.browser_block_assets:
+            self._context.route("**/*", _block_assets)
+        
+        # Invalida o cache de saude se o browser for fechado/crashar
+        self._context.on("close", lambda _: setattr(self, "_healthy", False))
+        
         # Usa a primeira pagina ou cria uma nova
         if self._context.pages:
             self._page = self._context.pages[0]
@@ -136,14 +265,47 @@ class PlaywrightThread:
             self._page = self._context.new_page()
         
         # Script anti-deteccao (mesma config do test_hybrid_login.py)
-        self._page.add_init_script("""
+        # Aplicado no contexto para valer tambem nas paginas do pool
+        self._context.add_init_script("""
             Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
         """)
+        
+        self._healthy = True
+        self._last_health_check = time.monotonic()
+    
+    def _acquire_page(self) -> Page:
+        """
+        Obtem uma pagina de trabalho do pool (cria uma nova se nao houver livre).
+        A pagina de sessao (self._page) fica reservada para login/navegacao.
+        """
+        while self._idle_pages:
+            page = self._idle_pages.pop()
+            if not page.is_closed():
+                return page
+        return self._context.new_page()
+    
+    def _release_page(self, page: Page):
+        """Devolve uma pagina ao pool, fechando o excedente"""
+        if page.is_closed():
+            return
+        if len(self._idle_pages) < self._settings.browser_page_pool_size:
+            self._idle_pages.append(page)
+        else:
+            try:
+                page.close()
+            except Exception:
+                pass
     
-    def _cleanup_resources(self):
-        """Limpa recursos do Playwright"""
+    def _cleanup_resources(self, graceful: bool = True):
+        """
+        Limpa recursos do Playwright.
+        
+        Com graceful=False (browser ja desconectado) o context.close() e
+        pulado: ele so esperaria por um processo morto. O playwright.stop()
+        encerra o driver e os processos do browser de qualquer forma.
+        """
         try:
-            if self._context:
+            if self._context and graceful:
                 self._context.close()
         except Exception:
             pass
@@ -156,14 +318,39 @@ class PlaywrightThread:
         
         self._context = None
         self._page = None
+        self._idle_pages = []
+        self._login_locators = {}
         self._playwright = None
+        self._healthy = False
+        self._last_url = None
     
     def _do_close(self):
         """Fecha o browser na thread dedicada"""
         self._cleanup_resources()
     
+    def _remember_url(self) -> str:
+        """Registra a URL da pagina de sessao apos uma navegacao"""
+        self._last_url = self._page.url
+        self._last_url_ts = time.monotonic()
+        return self._last_url
+    
     def _do_is_logged_in(self) -> bool:
-        """Verifica login na thread dedicada"""
+        """Verifica login na thread dedicada e registra o estado do worker"""
+        self._logged_in = self._check_logged_in()
+        return self._logged_in
+    
+    def _check_logged_in(self) -> bool:
+        """Verifica se a pagina de sessao esta logada"""
+        # URL registrada na ultima navegacao, se recente, dispensa tocar na pagina
+        if (
+            self._healthy
+            and self._last_url
+            and time.monotonic() - self._last_url_ts < LAST_URL_TTL
+            and "/records" in self._last_url
+            and "/login" not in self._last_url
+        ):
+            return True
+        
         self._do_initialize()
         
         try:
@@ -175,10 +362,10 @@ class PlaywrightThread:
                 return True
             
             # Se nao, navegar para records e verificar
-            self._page.goto("https://www.djiag.com/br/records", wait_until="networkidle", timeout=60000)
-            time.sleep(3)
+            self._page.goto("https://www.djiag.com/br/records", wait_until="domcontentloaded", timeout=60000)
+            self._wait_for_records_or_login(timeout=15000)
             
-            current_url = self._page.url
+            current_url = self._remember_url()
             
             # Se esta em /records e nao em /login, esta logado
             if "/records" in current_url and "/login" not in current_url:
@@ -189,10 +376,23 @@ class PlaywrightThread:
         except Exception:
             return False
     
-    def _do_navigate(self, url: str) -> str:
-        """Navega para uma URL na thread dedicada"""
+    def _do_navigate(self, url: str, wait_selector: Optional[str] = None) -> str:
+        """
+        Navega para uma URL na thread dedicada.
+        
+        Com wait_selector, espera so o DOM e depois o elemento de interesse
+        (bem mais rapido que aguardar o evento load em paginas SPA).
+        """
         self._do_initialize()
-        self._page.goto(url, wait_until="networkidle", timeout=60000)
+        if wait_selector:
+            self._page.goto(url, wait_until="domcontentloaded", timeout=60000)
+            try:
+                self._page.wait_for_selector(wait_selector, timeout=15000)
+            except PlaywrightTimeoutError:
+                pass  # O chamador inspeciona o conteudo retornado
+        else:
+            self._page.goto(url, wait_until="load", timeout=60000)
+        self._remember_url()
         return self._page.content()
     
     def _do_get_page_content(self) -> str:
@@ -229,11 +429,57 @@ class PlaywrightThread:
         self._do_initialize()
         self._page.screenshot(path=path)
     
+    def _wait_for_records_or_login(self, timeout: int):
+        """
+        Aguarda a pagina se definir: tabela de records renderizada ou
+        redirecionamento para login. Retorna assim que um dos dois ocorrer.
+        """
+        try:
+            self._page.wait_for_function(
+                "() => location.href.includes('/login') || !!document.querySelector('.ant-table')",
+                timeout=timeout,
+            )
+        except Exception:
+            # Timeout ou contexto destruido por redirect: o chamador confere a URL
+            pass
+    
+    def _login_locator(self, selector: str) -> Locator:
+        """
+        Locator (primeiro match) da pagina de sessao, criado uma vez e
+        reutilizado em novos logins. Invalidado no cleanup dos recursos.
+        """
+        locator = self._login_locators.get(selector)
+        if locator is None:
+            locator = self._page.locator(selector).first
+            self._login_locators[selector] = locator
+        return locator
+    
+    def _click_first_visible(self, selector_groups: Tuple[str, ...], timeout: int) -> bool:
+        """
+        Clica no primeiro elemento visivel do primeiro grupo de seletores que casar.
+        Cada grupo e uma uniao CSS resolvida em uma unica consulta ao browser.
+        """
+        for selector in selector_groups:
+            try:
+                btn = self._login_locator(f"{selector} >> visible=true")
+                btn.wait_for(state="visible", timeout=timeout)
+                btn.click()
+                return True
+            except Exception:
+                continue
+        return False
+    
     def _do_login(self) -> bool:
         """
         Realiza login no DJI AG usando credenciais do .env
-        Retorna True se login bem-sucedido
+        Retorna True se login bem-sucedido (falha ou excecao marcam o worker como deslogado)
         """
+        self._logged_in = False
+        self._logged_in = self._login()
+        return self._logged_in
+    
+    def _login(self) -> bool:
+        """Fluxo de login na pagina de sessao"""
         self._do_initialize()
         
         email = self._settings.DJI_USERNAME
@@ -243,10 +489,10 @@ class PlaywrightThread:
             raise ValueError("DJI_USERNAME e DJI_PASSWORD devem estar configurados no .env")
         
         # Navegar para records (redireciona para login se nao autenticado)
-        self._page.goto("https://www.djiag.com/br/records", timeout=60000, wait_until="networkidle")
+        self._page.goto("https://www.djiag.com/br/records", timeout=60000, wait_until="domcontentloaded")
         
         # Aguardar estabilizacao da pagina (pode redirecionar)
-        time.sleep(5)
+        self._wait_for_records_or_login(timeout=15000)
         
         current_url = self._page.url
         
@@ -256,160 +502,228 @@ class PlaywrightThread:
         
         # Precisa fazer login
         if "/login" in current_url:
-            # Aceitar cookies se aparecer
+            # Aceitar cookies se aparecer.
+            # is_visible() nao espera (ignora timeout): o SPA ainda pode estar
+            # renderizando o formulario, entao cada elemento e aguardado com wait_for
             try:
-                cookies_btn = self._page.locator("button:has-text('Accept'), button:has-text('Aceitar')").first
-                if cookies_btn.is_visible(timeout=2000):
-                    cookies_btn.click()
-                    time.sleep(1)
-            except:
+                cookies_btn = self._login_locator("button:has-text('Accept'), button:has-text('Aceitar')")
+                cookies_btn.wait_for(state="visible", timeout=2000)
+                cookies_btn.click()
+            except PlaywrightTimeoutError:
                 pass
             
             # Procurar checkbox "I have read..."
             try:
-                checkbox = self._page.locator("input[type='checkbox']").first
-                if checkbox.is_visible(timeout=5000):
-                    checkbox.click()
-                    time.sleep(1)
-            except:
+                checkbox = self._login_locator("input[type='checkbox']")
+                checkbox.wait_for(state="visible", timeout=5000)
+                checkbox.click()
+            except PlaywrightTimeoutError:
                 pass
             
             # Clicar em "Login with DJI account"
-            selectors = [
-                "button:has-text('Log in with DJI')",
-                "button:has-text('Login with DJI')", 
-                "a:has-text('Log in with DJI')",
-                "a:has-text('Login with DJI')",
-                "[class*='login']",
-                "button:has-text('Log in')",
-                "button:has-text('Login')",
-            ]
+            self._click_first_visible(DJI_LOGIN_BUTTON_SELECTORS, timeout=3000)
             
-            clicked = False
-            for selector in selectors:
-                try:
-                    btn = self._page.locator(selector).first
-                    if btn.is_visible(timeout=2000):
-                        btn.click()
-                        clicked = True
-                        break
-                except:
-                    continue
-            
-            time.sleep(3)
+            # Aguardar redirecionamento para o account.dji.com
+            try:
+                self._page.wait_for_url(lambda url: "account.dji.com" in url, timeout=10000)
+            except PlaywrightTimeoutError:
+                pass
             current_url = self._page.url
         
         # Preencher credenciais no account.dji.com
         if "account.dji.com" in current_url:
-            time.sleep(2)
-            
             # Email
             try:
-                email_field = self._page.locator("input[name='username'], input[type='email'], input[type='text']").first
-                if email_field.is_visible(timeout=5000):
-                    email_field.click()
-                    time.sleep(0.3)
-                    email_field.type(email, delay=30)
-                    time.sleep(0.5)
+                email_field = self._login_locator("input[name='username'], input[type='email'], input[type='text']")
+                email_field.wait_for(state="visible", timeout=5000)
+                email_field.fill(email)
             except:
                 pass
             
             # Senha
             try:
-                pass_field = self._page.locator("input[type='password']").first
-                if pass_field.is_visible(timeout=3000):
-                    pass_field.click()
-                    time.sleep(0.3)
-                    pass_field.type(password, delay=30)
-                    time.sleep(0.5)
-            except:
+                pass_field = self._login_locator("input[type='password']")
+                pass_field.wait_for(state="visible", timeout=3000)
+                pass_field.fill(password)
+            except PlaywrightTimeoutError:
                 pass
             
             # Clicar em Login
-            login_selectors = [
-                "button[type='submit']",
-                "button:has-text('Log in')",
-                "button:has-text('Login')",
-                "button:has-text('Sign in')",
-            ]
-            
-            for selector in login_selectors:
-                try:
-                    btn = self._page.locator(selector).first
-                    if btn.is_visible(timeout=1000):
-                        btn.click()
-                        break
-                except:
-                    continue
+            self._click_first_visible(ACCOUNT_SUBMIT_SELECTORS, timeout=1000)
             
             # Aguardar redirecionamento (ate 60s para CAPTCHA manual)
-            for i in range(60):
-                time.sleep(1)
-                current_url = self._page.url
-                if "account.dji.com/login" not in current_url and "account.dji.com/logout" not in current_url:
-                    break
+            try:
+                self._page.wait_for_url(
+                    lambda url: "account.dji.com/login" not in url and "account.dji.com/logout" not in url,
+                    timeout=CAPTCHA_TIMEOUT_MS,
+                )
+            except PlaywrightTimeoutError:
+                pass
         
         # Navegar de volta para records
-        time.sleep(2)
-        self._page.goto("https://www.djiag.com/br/records", wait_until="networkidle", timeout=60000)
-        time.sleep(5)
+        self._page.goto("https://www.djiag.com/br/records", wait_until="domcontentloaded", timeout=60000)
+        self._wait_for_records_or_login(timeout=15000)
         
-        current_url = self._page.url
+        current_url = self._remember_url()
         return "/records" in current_url and "/login" not in current_url
     
     def _do_execute_function(self, func: Callable, *args, **kwargs) -> Any:
-        """Executa funcao arbitraria com acesso a page na thread dedicada"""
+        """
+        Executa funcao arbitraria com acesso a page na thread dedicada.
+        A funcao recebe uma pagina do pool, isolada da pagina de sessao.
+        """
         self._do_initialize()
-        return func(self._page, self._context, *args, **kwargs)
+        page = self._acquire_page()
+        try:
+            return func(page, self._context, *args, **kwargs)
+        finally:
+            # Redirecionada para o login: a sessao deste worker expirou
+            if "/login" in page.url:
+                self._logged_in = False
+            self._release_page(page)
+
+
+class BrowserPool:
+    """
+    Conjunto de PlaywrightThreads, cada um com seu proprio Chromium.
+    
+    O primeiro worker usa o perfil configurado e concentra as operacoes de
+    sessao (login, navegacao). Tarefas independentes (leitura de records)
+    sao distribuidas para o worker com menos tarefas pendentes.
+    Cada worker extra usa um perfil proprio (<perfil>-N) e precisa de login:
+    so recebe tarefas enquanto a sua sessao estiver confirmada.
+    """
+    
+    def __init__(self, size: int):
+        profile_dir = get_settings().browser_profile_dir
+        self._threads = [
+            PlaywrightThread(profile_dir if i == 0 else f"{profile_dir}-{i}")
+            for i in range(max(1, size))
+        ]
+        self._pending = [0] * len(self._threads)
+        self._lock = threading.Lock()
+    
+    @property
+    def primary(self) -> PlaywrightThread:
+        """Worker que guarda a sessao principal"""
+        return self._threads[0]
+    
+    @property
+    def threads(self) -> List[PlaywrightThread]:
+        return list(self._threads)
+    
+    def start(self):
+        for pw_thread in self._threads:
+            pw_thread.start()
+    
+    def stop(self):
+        for pw_thread in self._threads:
+            pw_thread.stop()
+    
+    async def initialize_all(self) -> List[Any]:
+        """
+        Inicializa o browser de todos os workers em paralelo e verifica a
+        sessao de cada um (perfis persistentes podem ja estar logados).
+        Retorna o resultado de cada worker (excecoes sao devolvidas, nao levantadas).
+        """
+        return await asyncio.gather(
+            *(t.execute_async(t._do_is_logged_in) for t in self._threads),
+            return_exceptions=True,
+        )
+    
+    async def close_all(self):
+        """Fecha o browser de todos os workers e encerra as threads"""
+        await asyncio.gather(
+            *(t.execute_async(t._do_close) for t in self._threads),
+            return_exceptions=True,
+        )
+        await asyncio.to_thread(self.stop)
+    
+    def acquire(self) -> PlaywrightThread:
+        """
+        Reserva o worker com menos tarefas pendentes. Workers extras sem
+        sessao confirmada ficam de fora; o principal e sempre elegivel.
+        """
+        with self._lock:
+            candidates = [
+                i for i, pw_thread in enumerate(self._threads)
+                if i == 0 or pw_thread.logged_in
+            ]
+            index = min(candidates, key=self._pending.__getitem__)
+            self._pending[index] += 1
+            return self._threads[index]
+    
+    def release(self, pw_thread: PlaywrightThread):
+        """Libera um worker reservado por acquire()"""
+        with self._lock:
+            self._pending[self._threads.index(pw_thread)] -= 1
+    
+    async def execute_function_async(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Executa func(page, context, *args, **kwargs) no worker menos ocupado.
+        Para tarefas que nao dependem do estado da pagina de sessao.
+        """
+        pw_thread = self.acquire()
+        try:
+            return await pw_thread.execute_async(
+                pw_thread._do_execute_function,
+                func,
+                *args,
+                **kwargs
+            )
+        finally:
+            self.release(pw_thread)
 
 
-# Instancia global do PlaywrightThread
-_playwright_thread: Optional[PlaywrightThread] = None
+# Instancia global do BrowserPool
+_browser_pool: Optional[BrowserPool] = None
 _thread_lock = threading.Lock()
 
 
-def get_playwright_thread() -> PlaywrightThread:
-    """Obtem a instancia global do PlaywrightThread"""
-    global _playwright_thread
+def get_browser_pool() -> BrowserPool:
+    """Obtem a instancia global do BrowserPool"""
+    global _browser_pool
     with _thread_lock:
-        if _playwright_thread is None:
-            _playwright_thread = PlaywrightThread()
-            _playwright_thread.start()
-        return _playwright_thread
+        if _browser_pool is None:
+            _browser_pool = BrowserPool(get_settings().browser_pool_size)
+            _browser_pool.start()
+        return _browser_pool
+
+
+def get_playwright_thread() -> PlaywrightThread:
+    """Obtem o PlaywrightThread principal (sessao) do pool global"""
+    return get_browser_pool().primary
 
 
 class BrowserService(IBrowserService):
     """Implementacao do servico de browser usando Playwright sync API"""
     
     def __init__(self):
-        self._pw_thread = get_playwright_thread()
+        self._pool = get_browser_pool()
+        self._pw_thread = self._pool.primary
     
     async def initialize(self) -> None:
         """Inicializa o browser"""
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            self._pw_thread.execute,
+        await self._pw_thread.execute_async(
             self._pw_thread._do_initialize
         )
     
     async def close(self) -> None:
         """Fecha o browser"""
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            self._pw_thread.execute,
+        await self._pw_thread.execute_async(
             self._pw_thread._do_close
         )
     
     async def is_logged_in(self) -> bool:
-        """Verifica se esta logado no DJI AG"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self._pw_thread.execute,
-            self._pw_thread._do_is_logged_in
-        )
+        """
+        Verifica se esta logado no DJI AG.
+        Com mais de um worker no pool, todos precisam estar logados.
+        """
+        results = await asyncio.gather(*(
+            pw_thread.execute_async(pw_thread._do_is_logged_in)
+            for pw_thread in self._pool.threads
+        ))
+        return all(results)
     
     async def is_authenticated(self) -> bool:
         """Verifica se esta autenticado (alias para is_logged_in)"""
@@ -417,43 +731,35 @@ class BrowserService(IBrowserService):
     
     async def navigate_to_records(self) -> None:
         """Navega para a pagina de records"""
-        await self.navigate("https://www.djiag.com/br/records")
+        await self.navigate(
+            "https://www.djiag.com/br/records",
+            wait_selector=".ant-table, .login-form, input[type='password']",
+        )
     
-    async def navigate(self, url: str) -> str:
+    async def navigate(self, url: str, wait_selector: Optional[str] = None) -> str:
         """Navega para uma URL e retorna o conteudo"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self._pw_thread.execute,
+        return await self._pw_thread.execute_async(
             self._pw_thread._do_navigate,
-            url
+            url,
+            wait_selector
         )
     
     async def get_page_content(self) -> str:
         """Obtem o conteudo HTML da pagina atual"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self._pw_thread.execute,
+        return await self._pw_thread.execute_async(
             self._pw_thread._do_get_page_content
         )
     
     async def execute_script(self, script: str) -> Any:
         """Executa JavaScript na pagina"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self._pw_thread.execute,
+        return await self._pw_thread.execute_async(
             self._pw_thread._do_execute_script,
             script
         )
     
     async def wait_for_selector(self, selector: str, timeout: int = 30000) -> bool:
         """Aguarda um seletor CSS aparecer na pagina"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self._pw_thread.execute,
+        return await self._pw_thread.execute_async(
             self._pw_thread._do_wait_for_selector,
             selector,
             timeout
@@ -461,20 +767,14 @@ class BrowserService(IBrowserService):
     
     async def click(self, selector: str) -> None:
         """Clica em um elemento"""
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            self._pw_thread.execute,
+        await self._pw_thread.execute_async(
             self._pw_thread._do_click,
             selector
         )
     
     async def fill(self, selector: str, value: str) -> None:
         """Preenche um campo de input"""
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            self._pw_thread.execute,
+        await self._pw_thread.execute_async(
             self._pw_thread._do_fill,
             selector,
             value
@@ -482,38 +782,29 @@ class BrowserService(IBrowserService):
     
     async def screenshot(self, path: str) -> None:
         """Tira um screenshot da pagina"""
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            self._pw_thread.execute,
+        await self._pw_thread.execute_async(
             self._pw_thread._do_screenshot,
             path
         )
     
     async def login(self) -> bool:
-        """Realiza login no DJI AG usando credenciais do .env"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self._pw_thread.execute,
-            self._pw_thread._do_login
-        )
+        """
+        Realiza login no DJI AG usando credenciais do .env.
+        Com mais de um worker no pool, cada browser faz o seu login.
+        """
+        results = await asyncio.gather(*(
+            pw_thread.execute_async(pw_thread._do_login)
+            for pw_thread in self._pool.threads
+        ))
+        return all(results)
     
     async def execute_in_browser(self, func: Callable, *args, **kwargs) -> Any:
         """
         Executa uma funcao arbitraria no contexto do browser.
         A funcao recebe (page, context, *args, **kwargs) como parametros.
+        Roda no worker do pool com menos tarefas pendentes.
         """
-        from functools import partial
-        loop = asyncio.get_event_loop()
-        
-        # Usar partial para passar kwargs corretamente
-        wrapped_func = partial(self._pw_thread._do_execute_function, func, *args, **kwargs)
-        return await loop.run_in_executor(
-            None,
-            self._pw_thread.execute,
-            wrapped_func
-        )
+        return await self._pool.execute_function_async(func, *args, **kwargs)
 
 
 # Funcao helper para executar codigo no browser de forma assincrona
@@ -522,17 +813,7 @@ async def execute_in_browser_async(func: Callable, *args, **kwargs) -> Any:
     Helper para executar uma funcao no contexto do browser.
     A funcao recebe (page, context, *args, **kwargs).
     """
-    from functools import partial
-    pw_thread = get_playwright_thread()
-    loop = asyncio.get_event_loop()
-    
-    # Usar partial para passar kwargs corretamente
-    wrapped_func = partial(pw_thread._do_execute_function, func, *args, **kwargs)
-    return await loop.run_in_executor(
-        None,
-        pw_thread.execute,
-        wrapped_func
-    )
+    return await get_browser_pool().execute_function_async(func, *args, **kwargs)
 
 
 # Alias para compatibilidade com codigo existente
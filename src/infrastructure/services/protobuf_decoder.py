@@ -2,23 +2,48 @@
 Protobuf Decoder Service
 """
 import struct
-from collections import defaultdict
-from typing import Dict, List, Tuple, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from ...domain.entities import FlightData, GpsPoint
 from ..config import get_settings
 
+# Unpackers pre-compilados (evita reparse do formato a cada campo)
+_unpack_double = struct.Struct('<d').unpack_from
+_unpack_float = struct.Struct('<f').unpack_from
+
+# Profundidade do protobuf onde ficam os pontos da trajetoria
+TRACK_DEPTH = 3
+
+# Faixas validas da telemetria (min, max)
+HEADING_RANGE = (-180, 180)
+VELOCITY_RANGE = (-30, 30)
+SPRAY_RANGE = (0, 50)
+
+# Preenchimento de telemetria ausente (falha em qualquer comparacao)
+_NAN = float('nan')
+
 
 class ProtobufDecoder:
     """Decodificador de dados protobuf binários"""
     
     def __init__(self):
         self._settings = get_settings()
+        s = self._settings
+        self._bounds = (s.lat_min, s.lat_max, s.lon_min, s.lon_max)
     
-    def _decode_varint(self, data: bytes, pos: int) -> Tuple[int, int]:
-        """Decodifica um varint do protobuf"""
+    def _decode_varint(self, data: bytes, pos: int, end: Optional[int] = None) -> Tuple[int, int]:
+        """Decodifica um varint do protobuf (lendo no maximo ate end)"""
+        if end is None:
+            end = len(data)
+        
+        # Fast path: tags e tamanhos pequenos cabem em um unico byte
+        if pos < end:
+            byte = data[pos]
+            if byte < 0x80:
+                return byte, pos + 1
+        
         result, shift = 0, 0
-        while pos < len(data):
+        while pos < end:
             byte = data[pos]
             result |= (byte & 0x7F) << shift
             pos += 1
@@ -27,109 +52,146 @@ class ProtobufDecoder:
             shift += 7
         return result, pos
     
-    def _extract_all_values(self, data: bytes, max_depth: int = 6) -> Dict[int, Dict[str, List]]:
-        """Extrai todos os valores do protobuf por profundidade"""
-        all_values = defaultdict(lambda: defaultdict(list))
+    def _extract_all_values(
+        self, data: bytes, max_depth: int = 6, only_depth: Optional[int] = None
+    ) -> List[Dict[str, List]]:
+        """
+        Extrai todos os valores do protobuf por profundidade.
+        Com only_depth, apenas os valores dessa profundidade sao guardados.
+        """
+        # Um dict por profundidade (indice da lista = profundidade)
+        all_values: List[Dict[str, List]] = [{} for _ in range(max_depth + 1)]
         
-        def parse_recursive(data: bytes, depth: int = 0):
+        # Submensagens sao percorridas por offsets [start, end) no buffer
+        # original, sem copiar fatias. Os nomes usados no laco vem como
+        # argumentos default para virarem variaveis locais (LOAD_FAST).
+        def parse_recursive(
+            start: int,
+            end: int,
+            depth: int = 0,
+            data: bytes = data,
+            decode_varint: Callable = self._decode_varint,
+            unpack_double: Callable = _unpack_double,
+            unpack_float: Callable = _unpack_float,
+        ):
             if depth > max_depth:
                 return
-            pos = 0
-            while pos < len(data):
+            store = only_depth is None or depth == only_depth
+            bucket = all_values[depth]
+            pos = start
+            while pos < end:
                 try:
-                    tag, new_pos = self._decode_varint(data, pos)
-                    if new_pos >= len(data):
+                    tag, new_pos = decode_varint(data, pos, end)
+                    if new_pos >= end:
                         break
                     pos = new_pos
                     wire_type = tag & 0x07
                     field = tag >> 3
                     
                     if wire_type == 0:  # Varint
-                        val, pos = self._decode_varint(data, pos)
-                        if val < 1e15:
-                            all_values[depth][f'int_{field}'].append(val)
+                        val, pos = decode_varint(data, pos, end)
+                        if store and val < 1e15:
+                            key = f'int_{field}'
+                            lst = bucket.get(key)
+                            if lst is None:
+                                lst = bucket[key] = []
+                            lst.append(val)
                     elif wire_type == 1:  # 64-bit (double)
-                        if pos + 8 <= len(data):
-                            val = struct.unpack('<d', data[pos:pos+8])[0]
-                            if -1e10 < val < 1e10:
-                                all_values[depth][f'dbl_{field}'].append(val)
+                        if pos + 8 <= end:
+                            val = unpack_double(data, pos)[0]
+                            if store and -1e10 < val < 1e10:
+                                key = f'dbl_{field}'
+                                lst = bucket.get(key)
+                                if lst is None:
+                                    lst = bucket[key] = []
+                                lst.append(val)
                         pos += 8
                     elif wire_type == 2:  # Length-delimited
-                        length, pos = self._decode_varint(data, pos)
-                        if length and pos + length <= len(data):
-                            parse_recursive(data[pos:pos+length], depth + 1)
+                        length, pos = decode_varint(data, pos, end)
+                        if length and pos + length <= end:
+                            parse_recursive(pos, pos + length, depth + 1)
                             pos += length
                         else:
                             break
                     elif wire_type == 5:  # 32-bit (float)
-                        if pos + 4 <= len(data):
-                            val = struct.unpack('<f', data[pos:pos+4])[0]
-                            if -1e10 < val < 1e10:
-                                all_values[depth][f'flt_{field}'].append(val)
+                        if pos + 4 <= end:
+                            val = unpack_float(data, pos)[0]
+                            if store and -1e10 < val < 1e10:
+                                key = f'flt_{field}'
+                                lst = bucket.get(key)
+                                if lst is None:
+                                    lst = bucket[key] = []
+                                lst.append(val)
                         pos += 4
                     else:
                         break
-                except:
+                except (IndexError, struct.error):
+                    # Mensagem truncada/malformada: mantem o que ja foi lido
                     break
         
-        parse_recursive(data)
+        parse_recursive(0, len(data))
         return all_values
     
     def decode(self, binary_data: bytes, record_id: str) -> FlightData:
         """Decodifica dados binários para FlightData"""
-        all_values = self._extract_all_values(binary_data)
+        # Os pontos ficam na profundidade TRACK_DEPTH: nao ha por que descer
+        # alem dela nem guardar valores de outros niveis
+        all_values = self._extract_all_values(
+            binary_data, max_depth=TRACK_DEPTH, only_depth=TRACK_DEPTH
+        )
+        track = all_values[TRACK_DEPTH]
         
         # Pegar listas brutas
-        raw_lats = all_values[3]['dbl_1']
-        raw_lons = all_values[3]['dbl_2']
-        raw_headings = all_values[3]['dbl_3']
-        raw_vel_x = all_values[3]['flt_1']
-        raw_vel_y = all_values[3]['flt_2']
-        raw_spray = all_values[3]['flt_3']
+        # (pareadas por posicao global, por isso nao da para filtrar durante o parse)
+        raw_lats = track.get('dbl_1', [])
+        raw_lons = track.get('dbl_2', [])
+        raw_headings = track.get('dbl_3', [])
+        raw_vel_x = track.get('flt_1', [])
+        raw_vel_y = track.get('flt_2', [])
+        raw_spray = track.get('flt_3', [])
         
         # Filtrar pares válidos de coordenadas
-        points = []
-        num_raw = min(len(raw_lats), len(raw_lons))
+        lat_min, lat_max, lon_min, lon_max = self._bounds
+        heading_min, heading_max = HEADING_RANGE
+        vel_min, vel_max = VELOCITY_RANGE
+        spray_min, spray_max = SPRAY_RANGE
         
-        lat_min = self._settings.lat_min
-        lat_max = self._settings.lat_max
-        lon_min = self._settings.lon_min
-        lon_max = self._settings.lon_max
+        # Passo 1: indices com AMBAS coordenadas validas (zip ja limita ao
+        # menor comprimento entre lats e lons)
+        valid = [
+            i for i, (lat, lon) in enumerate(zip(raw_lats, raw_lons))
+            if lat_min < lat < lat_max and lon_min < lon < lon_max
+        ]
+        
+        # Passo 2: montar os pontos so para os indices validos.
+        # Listas de telemetria mais curtas sao completadas com NaN (que falha
+        # em qualquer comparacao de faixa), eliminando as checagens de tamanho
+        num_raw = min(len(raw_lats), len(raw_lons))
+        for side in (raw_headings, raw_vel_x, raw_vel_y, raw_spray):
+            if len(side) < num_raw:
+                side.extend([_NAN] * (num_raw - len(side)))
         
-        valid_index = 0
-        for i in range(num_raw):
-            lat = raw_lats[i]
-            lon = raw_lons[i]
+        # Tamanho final ja conhecido: lista pre-alocada, sem realocacoes
+        points: List[Optional[GpsPoint]] = [None] * len(valid)
+        for valid_index, i in enumerate(valid):
+            h = raw_headings[i]
+            heading = round(h, 2) if heading_min <= h <= heading_max else None
+            vx = raw_vel_x[i]
+            vel_x = round(vx, 2) if vel_min < vx < vel_max else None
+            vy = raw_vel_y[i]
+            vel_y = round(vy, 2) if vel_min < vy < vel_max else None
+            sr = raw_spray[i]
+            spray = round(sr, 2) if spray_min < sr < spray_max else None
             
-            # Validar AMBAS coordenadas juntas
-            if lat_min < lat < lat_max and lon_min < lon < lon_max:
-                heading = None
-                if i < len(raw_headings) and -180 <= raw_headings[i] <= 180:
-                    heading = round(raw_headings[i], 2)
-                
-                vel_x = None
-                if i < len(raw_vel_x) and -30 < raw_vel_x[i] < 30:
-                    vel_x = round(raw_vel_x[i], 2)
-                
-                vel_y = None
-                if i < len(raw_vel_y) and -30 < raw_vel_y[i] < 30:
-                    vel_y = round(raw_vel_y[i], 2)
-                
-                spray = None
-                if i < len(raw_spray) and 0 < raw_spray[i] < 50:
-                    spray = round(raw_spray[i], 2)
-                
-                point = GpsPoint(
-                    index=valid_index,
-                    latitude=lat,
-                    longitude=lon,
-                    heading=heading,
-                    velocity_x=vel_x,
-                    velocity_y=vel_y,
-                    spray_rate=spray,
-                )
-                points.append(point)
-                valid_index += 1
+            points[valid_index] = GpsPoint(
+                index=valid_index,
+                latitude=raw_lats[i],
+                longitude=raw_lons[i],
+                heading=heading,
+                velocity_x=vel_x,
+                velocity_y=vel_y,
+                spray_rate=spray,
+            )
         
         flight_data = FlightData(record_id=record_id, points=points)
         flight_data.calculate_bounds()
@@ -0,0 +1,42 @@
+"""
+Response Cache Service - Cache em memoria de respostas ja serializadas
+
+Flight records nao mudam depois de processados: o resultado de um record_id
+e deterministico. Guardar os bytes da resposta evita repetir navegacao,
+decodificacao e serializacao a cada request.
+"""
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class ResponseCache:
+    """Cache LRU com TTL de bytes serializados, por chave"""
+
+    def __init__(self, max_entries: int = 64):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Retorna os bytes guardados ou None se ausente/expirado"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, body = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return body
+
+    def set(self, key: str, body: bytes, ttl: float):
+        """Guarda os bytes por ttl segundos, descartando o menos usado se cheio"""
+        if ttl <= 0 or self._max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
@@ -3,6 +3,8 @@ FastAPI Application
 """
 import sys
 import asyncio
+import logging
+from functools import partial
 
 # Fix para Windows: Playwright precisa de ProactorEventLoop para criar subprocessos
 if sys.platform == "win32":
@@ -14,6 +16,27 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from .routes import records_router, health_router, auth_router
 from ..infrastructure.config import get_settings
+from ..infrastructure.services.browser_service import get_browser_pool
+
+logger = logging.getLogger(__name__)
+
+
+def _report_warmup(app: FastAPI, task: asyncio.Task):
+    """Registra o resultado do aquecimento do browser em app.state (exposto no /health)"""
+    if task.cancelled():
+        return
+    failures = [r for r in task.result() if isinstance(r, Exception)]
+    if failures:
+        app.state.browser_warmup = "failed"
+        app.state.browser_warmup_error = str(failures[0])
+        logger.warning(
+            "Browser warm-up failed in %d of %d workers: %s",
+            len(failures), len(task.result()), failures[0],
+            exc_info=failures[0],
+        )
+    else:
+        app.state.browser_warmup = "ready"
+        logger.info("Browser ready")
 
 
 @asynccontextmanager
@@ -21,12 +44,20 @@ async def lifespan(app: FastAPI):
     """Gerencia o ciclo de vida da aplicação"""
     settings = get_settings()
     print(f"🚀 Starting DJI AG API on {settings.api_host}:{settings.api_port}")
-    print("ℹ️  Browser will be initialized on first request (lazy loading)")
+    
+    # Aquece o browser em background: o primeiro request nao paga o startup do Chromium
+    pool = get_browser_pool()
+    app.state.browser_warmup = "warming_up"
+    app.state.browser_warmup_error = None
+    warmup = asyncio.create_task(pool.initialize_all())
+    warmup.add_done_callback(partial(_report_warmup, app))
+    logger.info("Browser warming up in background")
     
     yield
     
-    # Cleanup - browser fecha automaticamente quando o processo termina
+    # Cleanup - fecha os browsers para nao deixar processos do Chromium orfaos
     print("👋 Shutting down API")
+    await pool.close_all()
 
 
 def create_app() -> FastAPI:
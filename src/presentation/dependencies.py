@@ -1,11 +1,12 @@
 """
 Dependency Injection
 """
-from functools import lru_cache
+import threading
+from functools import wraps
 from fastapi import Header, HTTPException, Security
 from fastapi.security import APIKeyHeader
 
-from ..infrastructure.services import PlaywrightBrowserService
+from ..infrastructure.services import PlaywrightBrowserService, ResponseCache
 from ..infrastructure.repositories import DjiAgRecordRepository
 from ..infrastructure.config import get_settings
 from ..application.use_cases import (
@@ -53,37 +54,64 @@ async def verify_api_key(api_key: str = Security(api_key_header)) -> str:
     return api_key
 
 
-# Singleton para browser service
-_browser_service = None
+# Providers sincronos rodam no threadpool do FastAPI: primeiras chamadas
+# concorrentes poderiam criar duas instancias (ex.: dois caches de voo no
+# GetFlightDataUseCase). A criacao fica sob um lock (reentrante: providers
+# chamam outros providers); depois dela, a leitura nao trava.
+_provider_lock = threading.RLock()
 
 
+def _singleton(factory):
+    """Cria a dependencia uma unica vez e devolve sempre a mesma instancia"""
+    instance = None
+    
+    @wraps(factory)
+    def provider():
+        nonlocal instance
+        if instance is None:
+            with _provider_lock:
+                if instance is None:
+                    instance = factory()
+        return instance
+    
+    return provider
+
+
+@_singleton
 def get_browser_service() -> PlaywrightBrowserService:
-    global _browser_service
-    if _browser_service is None:
-        _browser_service = PlaywrightBrowserService()
-    return _browser_service
+    return PlaywrightBrowserService()
 
 
+@_singleton
 def get_record_repository() -> DjiAgRecordRepository:
     browser = get_browser_service()
     return DjiAgRecordRepository(browser)
 
 
+@_singleton
 def get_list_records_use_case() -> ListRecordsUseCase:
     repository = get_record_repository()
     return ListRecordsUseCase(repository)
 
 
+@_singleton
 def get_record_use_case() -> GetRecordUseCase:
     repository = get_record_repository()
     return GetRecordUseCase(repository)
 
 
+@_singleton
 def get_download_record_use_case() -> DownloadRecordUseCase:
     repository = get_record_repository()
     return DownloadRecordUseCase(repository)
 
 
+@_singleton
 def get_flight_data_use_case() -> GetFlightDataUseCase:
     repository = get_record_repository()
     return GetFlightDataUseCase(repository)
+
+
+@_singleton
+def get_response_cache() -> ResponseCache:
+    return ResponseCache(max_entries=get_settings().cache_max_entries)
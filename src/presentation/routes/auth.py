@@ -25,7 +25,7 @@ async def login(
     Autentica e mantém sessão para operações subsequentes.
     
     **Nota**: Se aparecer CAPTCHA, complete-o manualmente no browser.
-    O login aguardará até 30 segundos para conclusão.
+    O login aguardará até 60 segundos para conclusão.
     """
     try:
         success = await browser.login()
@@ -1,7 +1,8 @@
 """
 Health Check Routes
 """
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, Request
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -12,13 +13,24 @@ class HealthResponse(BaseModel):
     status: str
     timestamp: str
     version: str
+    browser: str = "unknown"  # warming_up, ready ou failed (aquecimento do pool)
+    browser_error: Optional[str] = None
 
 
 @router.get("/health", response_model=HealthResponse)
-async def health_check():
-    """Verifica a saúde da API"""
+async def health_check(request: Request):
+    """
+    Verifica a saúde da API.
+    
+    Inclui o estado do aquecimento do pool de browsers: com falha,
+    o status fica `degraded` e `browser_error` traz o motivo.
+    """
+    state = request.app.state
+    browser = getattr(state, "browser_warmup", "unknown")
     return HealthResponse(
-        status="healthy",
+        status="degraded" if browser == "failed" else "healthy",
         timestamp=datetime.now().isoformat(),
-        version="1.0.0"
+        version="1.0.0",
+        browser=browser,
+        browser_error=getattr(state, "browser_warmup_error", None),
     )
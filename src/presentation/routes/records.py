@@ -1,17 +1,29 @@
 """
 Records Routes
 """
-from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, Query
-from pydantic import BaseModel
+import asyncio
+import gzip
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Optional, List
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict
 
 from ..dependencies import (
     get_list_records_use_case,
     get_record_use_case,
     get_download_record_use_case,
     get_flight_data_use_case,
+    get_response_cache,
     verify_api_key,
 )
+from ...infrastructure.config import get_settings
+from ...infrastructure.services import ResponseCache
 from ...application.use_cases import (
     ListRecordsUseCase,
     GetRecordUseCase,
@@ -23,14 +35,114 @@ from ...application.use_cases import (
     GetFlightDataInput,
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/records", dependencies=[Depends(verify_api_key)])
 
+# Features serializadas por chunk no streaming do GeoJSON
+GEOJSON_STREAM_BATCH = 1000
+
+# Nivel de compressao do cache em disco do GeoJSON
+GEOJSON_GZIP_LEVEL = 4
+
+
+async def _stream_geojson(geojson: dict) -> AsyncIterator[bytes]:
+    """
+    Emite o FeatureCollection em partes: cabecalho, depois as features em
+    lotes. O documento completo nunca fica serializado inteiro em memoria.
+    """
+    features = geojson.get("features", [])
+    header = {key: value for key, value in geojson.items() if key != "features"}
+    
+    # '{"type":...,"properties":{...}' + ',"features":['
+    yield orjson.dumps(header)[:-1] + (b',"features":[' if header else b'"features":[')
+    
+    for start in range(0, len(features), GEOJSON_STREAM_BATCH):
+        batch = features[start:start + GEOJSON_STREAM_BATCH]
+        chunk = b",".join(orjson.dumps(feature) for feature in batch)
+        yield chunk if start == 0 else b"," + chunk
+    
+    yield b"]}"
+
+
+def _geojson_cache_path(record_id: str) -> Path:
+    """Arquivo .geojson.gz do record no diretorio de downloads"""
+    # Path(...).name impede que o record_id escape do diretorio
+    return Path(get_settings().downloads_dir) / "geojson" / f"{Path(record_id).name}.geojson.gz"
+
+
+async def _tee_to_gzip(chunks: AsyncIterator[bytes], path: Path) -> AsyncIterator[bytes]:
+    """
+    Repassa os chunks ao cliente e grava uma copia gzip em disco.
+    O arquivo so aparece (rename atomico) se o stream terminar por completo.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    gz = gzip.open(tmp_path, "wb", compresslevel=GEOJSON_GZIP_LEVEL)
+    try:
+        async for chunk in chunks:
+            yield chunk
+            await asyncio.to_thread(gz.write, chunk)
+        gz.close()
+        os.replace(tmp_path, path)
+    finally:
+        if not gz.closed:
+            gz.close()
+        tmp_path.unlink(missing_ok=True)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Compara If-None-Match com o ETag da representacao: lista separada por
+    virgula, comparacao fraca (ignora W/) entrada a entrada, '*' casa qualquer.
+    """
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Accept-Encoding aceita gzip? Respeita q-values: 'gzip;q=0' recusa,
+    e '*' vale para gzip quando ele nao aparece explicitamente.
+    """
+    wildcard = False
+    for entry in accept_encoding.split(","):
+        coding, _, params = entry.strip().partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding in ("gzip", "x-gzip"):
+            return q > 0
+        if coding == "*":
+            wildcard = q > 0
+    return wildcard
+
+
+def _model_response(model: BaseModel) -> Response:
+    """
+    Resposta JSON serializada pelo response model: os valores passam pela
+    validacao/coercao do Pydantic e a saida segue o schema publicado.
+    """
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
 
 # ============================================================
 # Response Models
 # ============================================================
 
 class RecordSummaryResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: str
     takeoff_landing_time: str
     flight_duration: str
@@ -43,13 +155,18 @@ class RecordSummaryResponse(BaseModel):
 
 
 class RecordListResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     items: List[RecordSummaryResponse]
     total: int
     page: int
     per_page: int
+    next_cursor: Optional[str] = None
 
 
 class RecordDetailResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: str
     serial_number: Optional[str] = None
     hardware_id: Optional[str] = None
@@ -88,6 +205,8 @@ class FlightDataResponse(BaseModel):
     bounds: Optional[dict] = None
     telemetry: Optional[dict] = None
     points: Optional[List[GpsPointResponse]] = None
+    page: Optional[int] = None
+    per_page: Optional[int] = None
 
 
 class DownloadResponse(BaseModel):
@@ -106,21 +225,27 @@ class DownloadResponse(BaseModel):
 async def list_records(
     page: int = Query(1, ge=1, description="Número da página"),
     per_page: int = Query(30, ge=1, le=100, description="Itens por página"),
+    after: Optional[str] = Query(None, description="Cursor: id do último record da página anterior"),
     use_case: ListRecordsUseCase = Depends(get_list_records_use_case),
+    cache: ResponseCache = Depends(get_response_cache),
 ):
     """
     Lista todos os flight records.
     
     Retorna uma lista paginada de todos os registros de voo disponíveis.
+    Para páginas profundas, prefira o cursor `after` com o `next_cursor`
+    da resposta anterior.
     """
-    result = await use_case.execute(ListRecordsInput(page=page, per_page=per_page))
+    cache_key = f"records:list:{page}:{per_page}:{after}"
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
     
-    return RecordListResponse(
-        items=[RecordSummaryResponse(**item.__dict__) for item in result.items],
-        total=result.total,
-        page=result.page,
-        per_page=result.per_page,
-    )
+    result = await use_case.execute(ListRecordsInput(page=page, per_page=per_page, after=after))
+    
+    response = _model_response(RecordListResponse.model_validate(result))
+    cache.set(cache_key, response.body, get_settings().cache_list_ttl)
+    return response
 
 
 @router.get("/{record_id}", response_model=RecordDetailResponse)
@@ -138,50 +263,61 @@ async def get_record(
     if not result:
         raise HTTPException(status_code=404, detail=f"Record {record_id} not found")
     
-    return RecordDetailResponse(**result.__dict__)
+    # Apenas os campos de RecordDetailResponse, com os tipos do schema (ex.: manual_mode bool)
+    return _model_response(RecordDetailResponse.model_validate(result))
 
 
 @router.get("/{record_id}/flight-data", response_model=FlightDataResponse)
 async def get_flight_data(
     record_id: str,
     include_points: bool = Query(True, description="Incluir pontos GPS individuais"),
+    page: Optional[int] = Query(None, ge=1, description="Página de pontos (omitido = todos)"),
+    per_page: int = Query(1000, ge=1, le=10000, description="Pontos por página"),
     use_case: GetFlightDataUseCase = Depends(get_flight_data_use_case),
+    cache: ResponseCache = Depends(get_response_cache),
 ):
     """
     Busca dados de voo de um record.
     
-    Retorna coordenadas GPS e telemetria do voo.
+    Retorna coordenadas GPS e telemetria do voo. Com `page`, os pontos vêm
+    paginados (`total_points` continua sendo o total do voo).
     """
-    import logging
-    logger = logging.getLogger(__name__)
+    cache_key = f"flight-data:{record_id}:{int(include_points)}:{page}:{per_page}"
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
     
     try:
-        logger.info(f"[FlightData Route] Buscando dados para record {record_id}")
+        logger.debug("[FlightData Route] Buscando dados para record %s", record_id)
         result = await use_case.execute(GetFlightDataInput(
             record_id=record_id,
             include_points=include_points,
             format="json",
+            page=page,
+            per_page=per_page,
         ))
-        logger.info(f"[FlightData Route] Use case retornou: {result is not None}")
         
         if not result:
             raise HTTPException(status_code=404, detail=f"Flight data for {record_id} not found")
         
-        points = None
-        if result.points:
-            points = [GpsPointResponse(**p.__dict__) for p in result.points]
-        
-        return FlightDataResponse(
-            record_id=result.record_id,
-            total_points=result.total_points,
-            bounds=result.bounds,
-            telemetry=result.telemetry,
-            points=points,
-        )
+        # Serializado direto pelo orjson (suporta dataclasses nativamente):
+        # evita validar cada ponto com Pydantic. O schema continua em FlightDataResponse.
+        # points: None sem include_points; [] para uma pagina alem do fim
+        response = ORJSONResponse({
+            "record_id": result.record_id,
+            "total_points": result.total_points,
+            "bounds": result.bounds,
+            "telemetry": result.telemetry,
+            "points": result.points,
+            "page": page,
+            "per_page": per_page if page is not None else None,
+        })
+        cache.set(cache_key, response.body, get_settings().cache_ttl)
+        return response
     except HTTPException:
         raise
     except Exception as e:
-        logger.exception(f"[FlightData Route] Erro inesperado: {e}")
+        logger.exception("[FlightData Route] Erro inesperado: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -189,6 +325,7 @@ async def get_flight_data(
 async def get_geojson(
     record_id: str,
     use_case: GetFlightDataUseCase = Depends(get_flight_data_use_case),
+    cache: ResponseCache = Depends(get_response_cache),
 ):
     """
     Retorna dados de voo em formato GeoJSON (resumido).
@@ -196,6 +333,11 @@ async def get_geojson(
     **Aviso**: Para GeoJSON completo, use `/geojson/download` que retorna arquivo.
     Este endpoint pode travar o Swagger com muitos pontos.
     """
+    cache_key = f"geojson:{record_id}"
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
     result = await use_case.execute(GetFlightDataInput(
         record_id=record_id,
         include_points=True,
@@ -205,12 +347,15 @@ async def get_geojson(
     if not result or not result.geojson:
         raise HTTPException(status_code=404, detail=f"GeoJSON for {record_id} not found")
     
-    return result.geojson
+    response = ORJSONResponse(result.geojson)
+    cache.set(cache_key, response.body, get_settings().cache_ttl)
+    return response
 
 
 @router.get("/{record_id}/geojson/download")
 async def download_geojson(
     record_id: str,
+    request: Request,
     use_case: GetFlightDataUseCase = Depends(get_flight_data_use_case),
 ):
     """
@@ -222,8 +367,35 @@ async def download_geojson(
     
     **Recomendado** para GeoJSON grandes que travam o Swagger.
     """
-    import json
-    from fastapi.responses import Response
+    headers = {
+        "Content-Disposition": f'attachment; filename="{record_id}.geojson"',
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "public, max-age=86400, immutable",
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    
+    # Records nao mudam: o GeoJSON gerado uma vez e servido do disco.
+    # ETag por representacao: a gzip identificada pelo tamanho do arquivo.
+    cache_path = _geojson_cache_path(record_id)
+    try:
+        cached_size = cache_path.stat().st_size
+    except FileNotFoundError:
+        cached_size = None
+    serve_gzip = cached_size is not None and _accepts_gzip(request.headers.get("accept-encoding", ""))
+    headers["ETag"] = f'W/"{record_id}-gzip-{cached_size:x}"' if serve_gzip else f'W/"{record_id}-identity"'
+    
+    # 304 sem navegar nem decodificar quando o record ja e conhecido:
+    # GeoJSON em disco ou voo ja carregado no cache do use case
+    record_known = cached_size is not None or use_case.has_flight_data(record_id)
+    if record_known and _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    if serve_gzip:
+        return FileResponse(
+            cache_path,
+            media_type="application/geo+json",
+            headers={**headers, "Content-Encoding": "gzip"},
+        )
     
     result = await use_case.execute(GetFlightDataInput(
         record_id=record_id,
@@ -234,11 +406,12 @@ async def download_geojson(
     if not result or not result.geojson:
         raise HTTPException(status_code=404, detail=f"GeoJSON for {record_id} not found")
     
-    geojson_str = json.dumps(result.geojson, ensure_ascii=False)
-    return Response(
-        content=geojson_str,
+    # Record desconhecido ate aqui: so agora o 304 pode ser confirmado
+    if _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    return StreamingResponse(
+        _tee_to_gzip(_stream_geojson(result.geojson), cache_path),
         media_type="application/geo+json",
-        headers={
-            "Content-Disposition": f'attachment; filename="{record_id}.geojson"'
-        }
+        headers=headers,
     )